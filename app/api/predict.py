@@ -1,108 +1,56 @@
 # src/api/predict.py
-from fastapi import APIRouter
-from pydantic import BaseModel
+from typing import Any, Dict, List, Optional
+
+from fastapi import APIRouter, HTTPException, Query, Request
+from pydantic import BaseModel, Field, FiniteFloat, model_validator
 import numpy as np
-import pandas as pd
-import joblib
-import json
+import logging
+import math
+import orjson
+import time
 
-with open('models/feature_means.json') as f:
-    feature_means = json.load(f)
-scaler = joblib.load('models/scaler.joblib')
-encoder = joblib.load('models/label_encoder.joblib')
+from app import config
+from app.api.responses import ORJSONResponse
+from app.audit import AuditLog, BodyDigest
+from app.batching import MicroBatcher
+from app.cache import PredictionCache
+from app.decision import DecisionPolicy
+from app.drift import DriftMonitor
+from app.executor import ExecutorSaturated, InferenceExecutor
+from app.features import UnknownFeatureError
+from app.wire import CONTENT_TYPE as COLUMNAR_CONTENT_TYPE, decode_rows
+from app.logging_config import should_dump_features
+from app.metrics import PREDICTIONS, STAGE_DECISION, STAGE_FEATURES, STAGE_INFERENCE, STAGE_VALIDATION, \
+    request_timing
+from app.registry import ModelBundle, ModelRegistry
+from app.scoring import top_k_indices
 
-# Модели
-linear_model = joblib.load("models/linear_regression.joblib")
-logistic_model = joblib.load("models/logistic_model.joblib")
+logger = logging.getLogger(__name__)
 
-router = APIRouter()
+# Реестр версий моделей: запрос берет registry.current один раз и доскоривается на ней,
+# даже если в это время подменили модель
+registry = ModelRegistry(config.MODELS_DIR)
+if config.SHARED_MODEL_DIR:
+    # Воркер под app.serve: веса и вектор средних уже выгружены мастером, читаем через mmap
+    registry.current = ModelBundle.load_compact(config.SHARED_MODEL_DIR)
+else:
+    registry.load()
+features_for_model = registry.current.assembler.features
+
+policy = DecisionPolicy.from_config()
+executor = InferenceExecutor(config.INFERENCE_WORKERS, config.INFERENCE_QUEUE)
+cache = PredictionCache(config.PREDICTION_CACHE_SIZE, config.PREDICTION_CACHE_TTL) \
+    if config.PREDICTION_CACHE_SIZE > 0 else None
+batcher = MicroBatcher(executor.run, config.MICROBATCH_MAX_SIZE,
+                       config.MICROBATCH_MAX_WAIT_MS / 1000) if config.MICROBATCH_ENABLED else None
+drift = DriftMonitor(config.DRIFT_PSI_ALERT) if config.DRIFT_MONITOR_ENABLED else None
+audit = AuditLog(config.AUDIT_DIR, config.AUDIT_QUEUE_SIZE, config.AUDIT_BATCH_SIZE,
+                 config.AUDIT_FLUSH_INTERVAL_MS / 1000, int(config.AUDIT_SEGMENT_MB * (1 << 20)),
+                 config.AUDIT_SEGMENT_SECONDS, config.AUDIT_ON_FULL, config.AUDIT_FSYNC,
+                 config.AUDIT_COMPRESSLEVEL) \
+    if config.AUDIT_ENABLED else None
 
-features_for_model = [
-        "INCOME",
-        "SAVINGS",
-        "DEBT",
-        "R_SAVINGS_INCOME",
-        "R_DEBT_INCOME",
-        "R_DEBT_SAVINGS",
-        "T_CLOTHING_12",
-        "T_CLOTHING_6",
-        "R_CLOTHING",
-        "R_CLOTHING_INCOME",
-        "R_CLOTHING_SAVINGS",
-        "R_CLOTHING_DEBT",
-        "T_EDUCATION_12",
-        "T_EDUCATION_6",
-        "R_EDUCATION",
-        "R_EDUCATION_INCOME",
-        "R_EDUCATION_SAVINGS",
-        "R_EDUCATION_DEBT",
-        "T_ENTERTAINMENT_12",
-        "T_ENTERTAINMENT_6",
-        "R_ENTERTAINMENT",
-        "R_ENTERTAINMENT_INCOME",
-        "R_ENTERTAINMENT_SAVINGS",
-        "R_ENTERTAINMENT_DEBT",
-        "T_FINES_12",
-        "T_FINES_6",
-        "R_FINES",
-        "R_FINES_INCOME",
-        "R_FINES_SAVINGS",
-        "R_FINES_DEBT",
-        "T_GAMBLING_12",
-        "T_GAMBLING_6",
-        "R_GAMBLING",
-        "R_GAMBLING_INCOME",
-        "R_GAMBLING_SAVINGS",
-        "R_GAMBLING_DEBT",
-        "T_GROCERIES_12",
-        "T_GROCERIES_6",
-        "R_GROCERIES",
-        "R_GROCERIES_INCOME",
-        "R_GROCERIES_SAVINGS",
-        "R_GROCERIES_DEBT",
-        "T_HEALTH_12",
-        "T_HEALTH_6",
-        "R_HEALTH",
-        "R_HEALTH_INCOME",
-        "R_HEALTH_SAVINGS",
-        "R_HEALTH_DEBT",
-        "T_HOUSING_12",
-        "T_HOUSING_6",
-        "R_HOUSING",
-        "R_HOUSING_INCOME",
-        "R_HOUSING_SAVINGS",
-        "R_HOUSING_DEBT",
-        "T_TAX_12",
-        "T_TAX_6",
-        "R_TAX",
-        "R_TAX_INCOME",
-        "R_TAX_SAVINGS",
-        "R_TAX_DEBT",
-        "T_TRAVEL_12",
-        "T_TRAVEL_6",
-        "R_TRAVEL",
-        "R_TRAVEL_INCOME",
-        "R_TRAVEL_SAVINGS",
-        "R_TRAVEL_DEBT",
-        "T_UTILITIES_12",
-        "T_UTILITIES_6",
-        "R_UTILITIES",
-        "R_UTILITIES_INCOME",
-        "R_UTILITIES_SAVINGS",
-        "R_UTILITIES_DEBT",
-        "T_EXPENDITURE_12",
-        "T_EXPENDITURE_6",
-        "R_EXPENDITURE",
-        "R_EXPENDITURE_INCOME",
-        "R_EXPENDITURE_SAVINGS",
-        "R_EXPENDITURE_DEBT",
-        "CAT_DEBT",
-        "CAT_CREDIT_CARD",
-        "CAT_MORTGAGE",
-        "CAT_SAVINGS_ACCOUNT",
-        "CAT_DEPENDENTS",
-        "CAT_GAMBLING_ENCODED"
-]
+router = APIRouter()
 
 
 class ClientData(BaseModel):
@@ -114,63 +62,467 @@ class ClientData(BaseModel):
     mortgage: int
     dependents: int
 
-def preprocess_features(data: ClientData):
-    r_debt_income = data.debt / data.income if data.income else 0
-    r_savings_income = data.savings / data.income if data.income else 0
-    r_expenditure_income = data.expenditure / data.income if data.income else 0
-
-    features = [
-        data.income,
-        data.debt,
-        data.expenditure,
-        data.savings,
-        data.credit_card,
-        data.mortgage,
-        data.dependents,
-        r_debt_income,
-        r_savings_income,
-        r_expenditure_income,
-    ]
-    return np.array(features).reshape(1, -1)
-
-def make_full_vector(input_dict):
-    # Приводим ключи к верхнему регистру
-    input_dict_upper = {k.upper(): v for k, v in input_dict.items()}
-    features = feature_means.copy()
-    features.update(input_dict_upper)
-    ordered = [features[k] for k in features_for_model]
-    print("Features for predict (ordered):", ordered)  # DEBUG
-    arr = np.array(ordered).reshape(1, -1)
-    arr_scaled = scaler.transform(arr)
-    return arr_scaled
-
-
-@router.post("/predict")
-async def predict_score(client: ClientData):
-    features = make_full_vector(client.dict())
-    credit_score = float(linear_model.predict(features)[0])
-    default_prob = float(logistic_model.predict_proba(features)[0][1])
-
-    print("credit_score:", credit_score)
-    print("default_prob:", default_prob)
-
-    if default_prob > 0.25:
-        decision = "REJECT"
-        risk_level = "High"
-    elif default_prob > 0.10:
-        decision = "REVIEW"
-        risk_level = "Medium"
+
+class FeatureData(BaseModel):
+    """Full feature map as sent by app/test.py and test_data: model feature name -> value"""
+    data: Dict[str, float]
+
+
+class BatchRequest(BaseModel):
+    clients: List[Any]
+
+
+class ScenarioAxis(BaseModel):
+    """One grid axis: absolute feature values, or factors applied to the client's own value"""
+    values: Optional[List[FiniteFloat]] = None
+    factors: Optional[List[FiniteFloat]] = None
+
+    @model_validator(mode="after")
+    def one_kind(self):
+        points = self.values if self.factors is None else self.factors
+        if (self.values is None) == (self.factors is None) or not points:
+            raise ValueError("an axis needs a non-empty list of either values or factors")
+        return self
+
+
+class ScenarioRequest(BaseModel):
+    """Base client (feature map, as in {"data": ...}) and the grid: feature name -> axis"""
+    client: Dict[str, FiniteFloat]
+    grid: Dict[str, ScenarioAxis] = Field(min_length=1)
+
+
+# Поле ClientData -> целое ли оно; /predict проверяет тело сам, без модели pydantic на каждый запрос
+CLIENT_FIELDS = {name: field.annotation is int for name, field in ClientData.model_fields.items()}
+PREDICT_BODY = {"requestBody": {"required": True, "content": {"application/json": {"schema": {
+    "anyOf": [ClientData.model_json_schema(), FeatureData.model_json_schema()]}}}}}
+CLIENTS_BODY = {"requestBody": {"required": True,
+                                "content": {"application/json": {"schema": BatchRequest.model_json_schema()}}}}
+BATCH_BODY = {"requestBody": {"required": True, "content": {
+    **CLIENTS_BODY["requestBody"]["content"],
+    COLUMNAR_CONTENT_TYPE: {"schema": {"type": "string", "format": "binary",
+                                       "description": "Binary columnar rows, see app/wire.py"}}}}}
+
+
+def _unprocessable(error_type, loc, msg, value):
+    return HTTPException(status_code=422, detail=[{"type": error_type, "loc": loc, "msg": msg, "input": value}])
+
+
+def _field_error(loc, value, integer):
+    """pydantic-compatible error entry for a field that is not a valid finite number"""
+    kind = "int" if integer else "float"
+    noun = "integer" if integer else "number"
+    number = _parsed(value, integer)
+    if number is not None and not math.isfinite(number):
+        return {"type": "finite_number", "loc": loc, "msg": "Input should be a finite number", "input": value}
+    if isinstance(value, str):
+        return {"type": f"{kind}_parsing", "loc": loc,
+                "msg": f"Input should be a valid {noun}, unable to parse string as {'an' if integer else 'a'} {noun}",
+                "input": value}
+    if integer and isinstance(value, float):
+        return {"type": "int_from_float", "loc": loc,
+                "msg": "Input should be a valid integer, got a number with a fractional part", "input": value}
+    return {"type": f"{kind}_type", "loc": loc, "msg": f"Input should be a valid {noun}", "input": value}
+
+
+def _parsed(value, integer=False):
+    """JSON value -> float the way pydantic's lax mode reads it, or None if it is not a number at all"""
+    if isinstance(value, str):
+        # float() понимает и цифры других алфавитов, и "1e3" для целого - pydantic нет
+        value = value.strip()
+        if not value.isascii() or (integer and not value.lstrip("+-").replace("_", "").replace(".", "", 1).isdigit()):
+            return None
+    elif not isinstance(value, (int, float)):  # bool - подкласс int, pydantic в lax-режиме его тоже принимает
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        return None
+
+
+def _number(value, integer=False):
+    """JSON value -> finite float, or None if pydantic (with finite-only floats) would have rejected it"""
+    number = _parsed(value, integer)
+    if number is None or not math.isfinite(number) or (integer and not number.is_integer()):
+        return None
+    return number
+
+
+def json_body(body):
+    try:
+        return orjson.loads(body)
+    except orjson.JSONDecodeError as e:
+        raise _unprocessable("json_invalid", ["body"], f"JSON decode error: {e}", {})
+
+
+def decode_client(body):
+    """Raw /predict body -> feature values, with the same checks (and 422 shape) as the pydantic models.
+
+    Accepts the 7 ClientData fields or the full {"data": {FEATURE: value, ...}} map;
+    features left out of the map are filled from feature_means.json.
+    """
+    payload = json_body(body)
+    if not isinstance(payload, dict):
+        raise _unprocessable("model_attributes_type", ["body"],
+                             "Input should be a valid dictionary or object to extract fields from", payload)
+
+    values, errors = {}, []
+    if "data" in payload:
+        data = payload["data"]
+        if not isinstance(data, dict):
+            raise _unprocessable("dict_type", ["body", "data"], "Input should be a valid dictionary", data)
+        for name, value in data.items():
+            number = _number(value)
+            if number is None:
+                errors.append(_field_error(["body", "data", name], value, False))
+            else:
+                values[name] = number
     else:
-        decision = "APPROVE"
-        risk_level = "Low"
+        for name, integer in CLIENT_FIELDS.items():
+            if name not in payload:
+                errors.append({"type": "missing", "loc": ["body", name], "msg": "Field required", "input": payload})
+                continue
+            number = _number(payload[name], integer)
+            if number is None:
+                errors.append(_field_error(["body", name], payload[name], integer))
+            else:
+                values[name] = number
+    if errors:
+        raise HTTPException(status_code=422, detail=errors)
+    return values
+
+
+def decode_clients(body):
+    """Raw JSON batch body -> list of client feature maps"""
+    payload = json_body(body)
+    clients = payload.get("clients") if isinstance(payload, dict) else None
+    if not isinstance(clients, list):
+        raise _unprocessable("list_type", ["body", "clients"], "Input should be a valid list", clients)
+    # Клиент в батче - плоская карта признаков или, как в /predict, {"data": {...}}
+    return [c["data"] if isinstance(c, dict) and isinstance(c.get("data"), dict) else c for c in clients]
+
+
+def make_full_vector(input_dict, bundle=None):
+    vector = (bundle or registry.current).assembler.vector(input_dict)
+    if should_dump_features(logger):
+        logger.debug("Features for predict (ordered)", extra={"fields": {"features": vector.tolist()}})
+    return vector
+
+
+def make_result(credit_score, default_prob, band=None):
+    risk_level, decision = band or policy.decide(default_prob)
     return {
-        "result": {
-            "credit_score": round(credit_score, 2),
-            "default_probability": round(default_prob * 100, 2),
-            "risk_level": risk_level,
-            "decision": decision
-        }
+        "credit_score": round(credit_score, 2),
+        "default_probability": round(default_prob * 100, 2),
+        "risk_level": risk_level,
+        "decision": decision
     }
-    print("Features for predict (after update):", features)
 
 
+def record_prediction(bundle, result):
+    PREDICTIONS.labels(bundle.version, result["risk_level"], result["decision"]).inc()
+
+
+def cache_lookup(bundle, features):
+    """-> (cache key, cached (credit_score, default_prob) or None); the key is None when caching is off"""
+    if cache is None:
+        return None, None
+    key = PredictionCache.key(features)
+    return key, cache.get(key, bundle.cache_version)
+
+
+def score_client(bundle, input_dict):
+    t = time.perf_counter()
+    features = make_full_vector(input_dict, bundle)
+    if drift is not None:
+        drift.observe(bundle, features)
+    t = STAGE_FEATURES.time(t)
+    key, scored = cache_lookup(bundle, features)
+    if scored is None:
+        scored = bundle.engine.score(features)
+        if key is not None:
+            cache.put(key, bundle.cache_version, scored)
+    t = STAGE_INFERENCE.time(t)
+    credit_score, default_prob = scored
+    logger.debug("Scored client", extra={"fields": {"credit_score": credit_score, "default_prob": default_prob}})
+    result = make_result(credit_score, default_prob)
+    STAGE_DECISION.time(t)
+    record_prediction(bundle, result)
+    return {"result": result, "model_version": bundle.version}
+
+
+def score_batch(bundle, clients):
+    matrix, errors = bundle.assembler.matrix(clients)
+    ok = np.array([e is None for e in errors], dtype=bool)
+
+    # Один проход по всем валидным строкам
+    scores = np.empty(len(errors))
+    probs = np.empty(len(errors))
+    if ok.any():
+        scores[ok], probs[ok] = bundle.engine.score_many(matrix[ok])
+        if drift is not None:
+            drift.observe_many(bundle, matrix[ok])
+
+    levels, decisions = policy.decide_many(probs[ok])
+    bands = zip(levels.tolist(), decisions.tolist())
+
+    predictions = []
+    for i, error in enumerate(errors):
+        if error is None:
+            result = make_result(float(scores[i]), float(probs[i]), next(bands))
+            record_prediction(bundle, result)
+            predictions.append({"client_index": i, "result": result})
+        else:
+            predictions.append({"client_index": i, "error": error})
+    return {
+        "predictions": predictions,
+        "total": len(predictions),
+        "successful": int(ok.sum()),
+        "model_version": bundle.version
+    }
+
+
+def score_columns(bundle, features, rows):
+    """Binary columnar batch: rows go straight into the scoring matrix, results come back as columns"""
+    matrix = bundle.assembler.column_matrix(dict(zip(features, rows.T)))
+    if not np.isfinite(matrix).all():
+        raise ValueError("feature values must be finite numbers (NaN marks a missing value)")
+    if drift is not None:
+        drift.observe_many(bundle, matrix)
+    scores, probs = bundle.engine.score_many(matrix)
+    bands = policy.bands(probs)
+    for band, count in enumerate(np.bincount(bands, minlength=len(policy.levels)).tolist()):
+        if count:
+            PREDICTIONS.labels(bundle.version, policy.levels[band], policy.decisions[band]).inc(count)
+    return {
+        "credit_score": np.round(scores, 2),
+        "default_probability": np.round(probs * 100, 2),
+        "risk_level": [policy.levels[b] for b in bands.tolist()],
+        "decision": [policy.decisions[b] for b in bands.tolist()],
+        "total": len(scores),
+        "model_version": bundle.version
+    }
+
+
+def explain_clients(bundle, clients, top_k):
+    """Scores plus the top_k contributions to the credit score and to the default log-odds, per client"""
+    matrix, errors = bundle.assembler.matrix(clients)
+    ok = np.array([e is None for e in errors], dtype=bool)
+    rows = matrix[ok]
+    scores, probs, contributions = bundle.engine.explain_many(rows)
+    levels, decisions = policy.decide_many(probs)
+    bands = zip(levels.tolist(), decisions.tolist())
+
+    # По каждому выходу: top_k индексов на строку одним argpartition, значения - одним take_along_axis
+    names = bundle.assembler.features
+    parts = {}
+    for output, terms, base in (("credit_score", contributions[0], bundle.engine.intercept[0]),
+                                ("default_log_odds", contributions[1], bundle.engine.intercept[1])):
+        top = top_k_indices(terms, top_k)
+        values = np.take_along_axis(terms, top, axis=1)
+        rest = terms.sum(axis=1) - values.sum(axis=1)
+        parts[output] = (float(base), top.tolist(), values.tolist(), rest.tolist())
+
+    explained = iter(range(len(rows)))
+    explanations = []
+    for i, error in enumerate(errors):
+        if error is not None:
+            explanations.append({"client_index": i, "error": error})
+            continue
+        n = next(explained)
+        explanation = {}
+        for output, (base, top, values, rest) in parts.items():
+            explanation[output] = {
+                "base": base,
+                "contributions": [{"feature": names[j], "value": float(rows[n, j]), "contribution": c}
+                                  for j, c in zip(top[n], values[n])],
+                "other": rest[n]
+            }
+        explanations.append({"client_index": i,
+                             "result": make_result(float(scores[n]), float(probs[n]), next(bands)),
+                             "explanation": explanation})
+    return {
+        "explanations": explanations,
+        "total": len(explanations),
+        "successful": int(ok.sum()),
+        "model_version": bundle.version
+    }
+
+
+def score_scenarios(bundle, client, grid):
+    """Cartesian what-if grid around one client, expanded into one matrix and scored in one pass.
+
+    Ratios the client did not send are re-derived at every grid point, so moving DEBT also
+    moves R_DEBT_INCOME and the other debt ratios.
+    """
+    assembler = bundle.assembler
+    columns = [assembler.column(name) for name in grid]
+    if len(set(columns)) != len(columns):
+        raise ValueError("each feature may appear in the grid only once")
+    shape = tuple(len(axis.values or axis.factors) for axis in grid.values())
+    size = math.prod(shape)
+    if size > config.SCENARIO_MAX_POINTS:
+        raise ValueError(f"grid has {size} points, the limit is {config.SCENARIO_MAX_POINTS}")
+
+    # Базовый клиент: NaN - не присланные признаки, их достроит complete() в каждой точке
+    sent = np.full(len(assembler.features), np.nan)
+    for key, value in client.items():
+        sent[assembler.column(key)] = value
+    base = assembler.complete(sent[None, :].copy())[0]
+    axes = [np.array(axis.values) if axis.factors is None else np.array(axis.factors) * base[j]
+            for j, axis in zip(columns, grid.values())]
+
+    matrix = np.tile(sent, (size, 1))
+    for j, points in zip(columns, np.meshgrid(*axes, indexing="ij")):
+        matrix[:, j] = points.ravel()
+    assembler.complete(matrix)
+    scores, probs = bundle.engine.score_many(matrix)
+    bands = policy.bands(probs).reshape(shape)
+
+    # Граница одобрения: одобренные точки, у которых сосед по какой-либо оси уже не одобрен
+    approved = policy.approved(bands)
+    edge = np.zeros(shape, dtype=bool)
+    for axis in range(len(shape)):
+        lower = tuple(slice(None, -1) if k == axis else slice(None) for k in range(len(shape)))
+        upper = tuple(slice(1, None) if k == axis else slice(None) for k in range(len(shape)))
+        changed = approved[lower] != approved[upper]
+        edge[lower] |= changed & approved[lower]
+        edge[upper] |= changed & approved[upper]
+    points = np.argwhere(edge)
+
+    names = [assembler.features[j] for j in columns]
+    return {
+        "base": make_result(*bundle.engine.score(base)),
+        "axes": dict(zip(names, axes)),
+        "shape": list(shape),
+        "credit_score": np.round(scores, 2).reshape(shape),
+        "default_probability": np.round(probs * 100, 2).reshape(shape),
+        "band": bands,
+        "bands": [{"risk_level": level, "decision": decision}
+                  for level, decision in zip(policy.levels, policy.decisions)],
+        "approval_boundary": {name: axis[points[:, k]] for k, (name, axis) in enumerate(zip(names, axes))},
+        "model_version": bundle.version
+    }
+
+
+def audit_decision(endpoint, bundle, request, response):
+    """Hand the decision to the audit writer; 503 if it cannot be recorded and AUDIT_ON_FULL=reject"""
+    if audit is not None and not audit.record(endpoint, bundle.version, request, response):
+        raise HTTPException(status_code=503, detail="Audit log is full, the decision was not recorded",
+                            headers={"Retry-After": str(config.INFERENCE_RETRY_AFTER)})
+
+
+async def run_inference(job):
+    """Await a scoring job on the inference pool so the event loop keeps serving /health and portfolio"""
+    try:
+        return await job
+    except ExecutorSaturated as e:
+        raise HTTPException(status_code=503, detail=str(e),
+                            headers={"Retry-After": str(config.INFERENCE_RETRY_AFTER)})
+
+
+@router.post("/predict", response_class=ORJSONResponse, openapi_extra=PREDICT_BODY)
+async def predict_score(request: Request):
+    body = await request.body()
+    values = decode_client(body)
+    t = time.perf_counter()
+    timing = request_timing.get()
+    if timing is not None:
+        STAGE_VALIDATION.observe(t - timing[0])  # чтение тела + разбор и проверка полей
+    bundle = registry.current
+    try:
+        if batcher is None:
+            response = await run_inference(executor.run(score_client, bundle, values))
+            audit_decision("/predict", bundle, body, response["result"])
+            if timing is not None:
+                timing[1] = time.perf_counter()
+            return ORJSONResponse(response)
+        features = make_full_vector(values, bundle)
+        if drift is not None:
+            drift.observe(bundle, features)
+    except UnknownFeatureError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    t = STAGE_FEATURES.time(t)
+
+    key, scored = cache_lookup(bundle, features)
+    if scored is None:
+        # Одиночные запросы из окна батчера скорятся одной матрицей
+        scored = await run_inference(batcher.submit(features, bundle.engine))
+        if key is not None:
+            cache.put(key, bundle.cache_version, scored)
+    t = STAGE_INFERENCE.time(t)
+    result = make_result(*scored)
+    t = STAGE_DECISION.time(t)
+    record_prediction(bundle, result)
+    audit_decision("/predict", bundle, body, result)
+    if timing is not None:
+        timing[1] = t
+    return ORJSONResponse({"result": result, "model_version": bundle.version})
+
+
+@router.post("/predict/batch", response_class=ORJSONResponse, openapi_extra=BATCH_BODY)
+async def predict_batch(request: Request):
+    body = await request.body()
+    bundle = registry.current
+    if request.headers.get("content-type", "").split(";")[0].strip() == COLUMNAR_CONTENT_TYPE:
+        try:
+            features, rows = decode_rows(body)
+            response = await run_inference(executor.run(score_columns, bundle, features, rows))
+        except ValueError as e:  # формат тела, неизвестный признак, нечисловые значения
+            raise HTTPException(status_code=422, detail=str(e))
+        # Сами строки в аудит не пишем: признаки, число строк и хэш тела, по которому их можно сверить
+        audit_decision("/predict/batch", bundle, {"features": features, "rows": len(rows),
+                                                  "blake2b": BodyDigest(body)}, response)
+        return ORJSONResponse(response)
+
+    clients = decode_clients(body)
+    response = await run_inference(executor.run(score_batch, bundle, clients))
+    audit_decision("/predict/batch", bundle, body, response["predictions"])
+    return ORJSONResponse(response)
+
+
+@router.post("/predict/explain", response_class=ORJSONResponse, openapi_extra=PREDICT_BODY)
+async def predict_explain(request: Request, top_k: int = Query(5, ge=1, le=100)):
+    """Why a client scored as they did: the top_k feature contributions to each model output"""
+    body = await request.body()
+    values = decode_client(body)
+    bundle = registry.current
+    explained = await run_inference(executor.run(explain_clients, bundle, [values], top_k))
+    item = explained["explanations"][0]
+    if "error" in item:
+        raise HTTPException(status_code=422, detail=item["error"])
+    audit_decision("/predict/explain", bundle, body, item["result"])
+    return ORJSONResponse({"result": item["result"], "explanation": item["explanation"],
+                           "model_version": bundle.version})
+
+
+@router.post("/predict/explain/batch", response_class=ORJSONResponse, openapi_extra=CLIENTS_BODY)
+async def predict_explain_batch(request: Request, top_k: int = Query(5, ge=1, le=100)):
+    """The /predict/explain breakdown for up to EXPLAIN_MAX_CLIENTS clients; 413 above that"""
+    body = await request.body()
+    clients = decode_clients(body)
+    if len(clients) > config.EXPLAIN_MAX_CLIENTS:
+        raise HTTPException(status_code=413, detail=f"{len(clients)} clients in one request, "
+                                                    f"the limit is {config.EXPLAIN_MAX_CLIENTS}")
+    bundle = registry.current
+    response = await run_inference(executor.run(explain_clients, bundle, clients, top_k))
+    # В аудит - решения, как у /predict/batch; разложение по признакам восстановимо по запросу и версии модели
+    audit_decision("/predict/explain/batch", bundle, body,
+                   [{k: v for k, v in item.items() if k != "explanation"} for item in response["explanations"]])
+    return ORJSONResponse(response)
+
+
+@router.post("/predict/scenarios", response_class=ORJSONResponse)
+async def predict_scenarios(request: ScenarioRequest):
+    """What-if sweep: score/probability surface over the grid and its approval boundary.
+
+    band holds indices into bands; approval_boundary lists the approved grid points next
+    to a point that is not approved (approved = the band's decision is APPROVE). Only the
+    base decision is audited: the grid points are hypothetical clients, not decisions.
+    """
+    bundle = registry.current
+    try:
+        response = await run_inference(executor.run(score_scenarios, bundle, request.client, request.grid))
+    except ValueError as e:  # неизвестный признак, повтор признака, слишком большая сетка
+        raise HTTPException(status_code=422, detail=str(e))
+    audit_decision("/predict/scenarios", bundle, request.model_dump(exclude_none=True), response["base"])
+    return ORJSONResponse(response)
@@ -0,0 +1,11 @@
+import orjson
+from starlette.responses import Response
+
+
+class ORJSONResponse(Response):
+    """JSON response rendered by orjson; numpy scalars and arrays are serialized natively"""
+
+    media_type = "application/json"
+
+    def render(self, content):
+        return orjson.dumps(content, option=orjson.OPT_SERIALIZE_NUMPY)
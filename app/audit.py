@@ -0,0 +1,185 @@
+"""Write-behind audit log of scoring decisions: request in, decision out, never on the response path.
+
+record() only appends to a bounded in-memory queue. A background thread drains it in
+batches, serializes them with orjson (raw JSON request bodies are copied verbatim) and group-commits every batch to the current
+segment: one compressed write, flush and (optionally) fsync per batch rather than per
+decision. Segments are gzip'ed JSONL files named audit-<UTC start>-<pid>-<seq>.jsonl.gz,
+rotated by size and age; every batch is flushed with a zlib sync point, so a crashed
+process leaves a segment that is readable up to its last commit.
+
+When the queue is full the entry is dropped and counted (credit_audit_entries_total
+{outcome="dropped"}); with on_full="reject" record() returns False instead and the
+caller answers 503, so no decision leaves the service unrecorded. close() drains the
+queue and closes the segment; it runs from the app's shutdown hook.
+"""
+import gzip
+import hashlib
+import logging
+import os
+import threading
+import time
+from collections import deque
+from datetime import datetime, timezone
+
+import orjson
+
+from app.logging_config import request_id_var
+from app.metrics import AUDIT_ENTRIES
+
+logger = logging.getLogger(__name__)
+
+_DROPPED = AUDIT_ENTRIES.labels("dropped")
+_REJECTED = AUDIT_ENTRIES.labels("rejected")
+_WRITTEN = AUDIT_ENTRIES.labels("written")
+_FAILED = AUDIT_ENTRIES.labels("failed")
+
+
+class BodyDigest:
+    """Stands in for a large binary request body: hashed in the writer thread, not on the request path"""
+
+    def __init__(self, body):
+        self.body = body
+
+    def hexdigest(self):
+        return hashlib.blake2b(self.body, digest_size=16).hexdigest()
+
+
+def _default(value):
+    if isinstance(value, BodyDigest):
+        return value.hexdigest()
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+
+class AuditLog:
+    def __init__(self, directory, max_queue=100000, batch_size=1000, flush_interval=0.2,
+                 segment_bytes=64 << 20, segment_seconds=3600, on_full="drop", fsync=True, compresslevel=1):
+        if on_full not in ("drop", "reject"):
+            raise ValueError(f"on_full must be 'drop' or 'reject', got {on_full!r}")
+        self.directory = directory
+        self.max_queue = max_queue
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.segment_bytes = segment_bytes
+        self.segment_seconds = segment_seconds
+        self.on_full = on_full
+        self.fsync = fsync
+        self.compresslevel = compresslevel
+        os.makedirs(directory, exist_ok=True)
+
+        self._queue = deque()
+        self._wakeup = threading.Event()
+        self._closing = False
+        self._segment = None
+        self._segment_path = None
+        self._segment_opened = 0.0
+        self._segment_written = 0
+        self._sequence = 0
+        self._thread = threading.Thread(target=self._run, name="audit-writer", daemon=True)
+        self._thread.start()
+
+    @property
+    def pending(self):
+        return len(self._queue)
+
+    def record(self, endpoint, model_version, request, response):
+        """Queue one decision; O(1) and lock-free. -> False if the entry was not accepted.
+
+        request is the raw JSON body as received (bytes, written verbatim) or any object
+        orjson can serialize; response is serialized by the writer thread.
+        """
+        if self._closing or len(self._queue) >= self.max_queue:
+            (_REJECTED if self.on_full == "reject" else _DROPPED).inc()
+            return self.on_full == "drop"
+        # Сериализация - в потоке писателя; сюда попадают объекты, которые больше никто не меняет
+        self._queue.append((time.time(), request_id_var.get(), endpoint, model_version, request, response))
+        if len(self._queue) >= self.batch_size:
+            self._wakeup.set()
+        return True
+
+    def _run(self):
+        while True:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            closing = self._closing
+            while self._queue:
+                self._commit([self._queue.popleft() for _ in range(min(self.batch_size, len(self._queue)))])
+            if self._segment is not None and time.monotonic() - self._segment_opened >= self.segment_seconds:
+                self._close_segment()  # следующий сегмент откроется с первой записью
+            if closing:
+                break
+        # Записи, успевшие встать в очередь, пока поток выходил из цикла
+        while self._queue:
+            self._commit([self._queue.popleft() for _ in range(min(self.batch_size, len(self._queue)))])
+        self._close_segment()
+
+    def _commit(self, batch):
+        lines = []
+        for ts, request_id, endpoint, model_version, request, response in batch:
+            entry = {"ts": datetime.fromtimestamp(ts, timezone.utc).isoformat(), "request_id": request_id,
+                     "endpoint": endpoint, "model_version": model_version, "response": response}
+            try:
+                head = orjson.dumps(entry, default=_default, option=orjson.OPT_SERIALIZE_NUMPY)
+                if isinstance(request, bytes):
+                    # Тело запроса - уже проверенный JSON, пишем как есть; переводы строк в нем только пробельные
+                    raw = request.replace(b"\n", b" ").replace(b"\r", b" ")
+                else:
+                    raw = orjson.dumps(request, default=_default, option=orjson.OPT_SERIALIZE_NUMPY)
+                lines.append(head[:-1] + b',"request":' + raw + b"}\n")
+            except TypeError as e:
+                _FAILED.inc()
+                logger.error(f"Audit entry from {endpoint} is not serializable: {e}")
+        if not lines:
+            return
+        data = b"".join(lines)
+        try:
+            if self._segment is None or self._segment_written >= self.segment_bytes:
+                self._open_segment()
+            self._segment.write(data)
+            # Одна точка синхронизации zlib + fsync на пачку: групповой коммит
+            self._segment.flush()
+            if self.fsync:
+                os.fsync(self._segment.fileobj.fileno())
+            self._segment_written += len(data)
+            _WRITTEN.inc(len(lines))
+        except OSError as e:
+            _FAILED.inc(len(lines))
+            logger.error(f"Audit write to {self._segment_path} failed, {len(lines)} entries lost: {e}")
+            self._close_segment()
+
+    def _open_segment(self):
+        self._close_segment()
+        self._sequence += 1
+        started = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+        self._segment_path = os.path.join(self.directory,
+                                          f"audit-{started}-{os.getpid()}-{self._sequence:04d}.jsonl.gz")
+        self._segment = gzip.open(self._segment_path, "wb", compresslevel=self.compresslevel)
+        self._segment_opened = time.monotonic()
+        self._segment_written = 0
+
+    def _close_segment(self):
+        if self._segment is not None:
+            try:
+                self._segment.close()
+            except OSError as e:
+                logger.error(f"Closing audit segment {self._segment_path} failed: {e}")
+            self._segment = None
+
+    def close(self, timeout=30):
+        """Stop accepting entries, write out everything queued and close the segment"""
+        self._closing = True
+        self._wakeup.set()
+        self._thread.join(timeout)
+        if self._thread.is_alive():
+            logger.error(f"Audit writer did not finish within {timeout}s, {len(self._queue)} entries not written")
+
+    def stats(self):
+        return {
+            "pending": len(self._queue),
+            "max_queue": self.max_queue,
+            "on_full": self.on_full,
+            "segment": self._segment_path,
+            "written": _WRITTEN.value(),
+            "dropped": _DROPPED.value(),
+            "rejected": _REJECTED.value(),
+            "failed": _FAILED.value(),
+        }
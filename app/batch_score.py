@@ -0,0 +1,212 @@
+"""Offline batch scoring of portfolio extracts (CSV / JSONL / Parquet).
+
+    python -m app.batch_score clients.csv scored.csv --chunk-size 50000 --workers 4
+
+The input is read in fixed-size chunks; every chunk is scored as one matrix by
+CreditScoringPredictor and appended to the output right away, so memory stays flat
+however large the file is. Columns are matched to model features by name (the API
+aliases and lowercase names work too); missing features and empty cells are filled
+from feature_means.json. JSONL records may also nest the features in a "data" or
+"features" object, as the API requests do. Other columns are ignored, except
+--id-column, which is copied to the output; an input without a single model feature
+column is an error. Parquet input/output needs pyarrow.
+"""
+import argparse
+import json
+import logging
+import multiprocessing
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from app.features import FeatureAssembler, UnknownFeatureError
+from app.predictor import CreditScoringPredictor
+
+logger = logging.getLogger("app.batch_score")
+
+FORMATS = {".csv": "csv", ".jsonl": "jsonl", ".ndjson": "jsonl", ".parquet": "parquet"}
+# Поля JSONL-записи, в которых лежат признаки в формате API: {"client_id": ..., "data": {...}}
+NESTED_FEATURE_FIELDS = ("data", "features")
+
+
+def file_format(path):
+    fmt = FORMATS.get(os.path.splitext(path)[1].lower())
+    if fmt is None:
+        raise ValueError(f"Unsupported file type: {path} (expected {', '.join(sorted(FORMATS))})")
+    return fmt
+
+
+def _parquet():
+    try:
+        import pyarrow.parquet
+    except ImportError:
+        raise RuntimeError("Parquet files need pyarrow: pip install pyarrow") from None
+    return pyarrow.parquet
+
+
+def read_chunks(path, chunk_size):
+    """Yield the input file as DataFrames of at most chunk_size rows"""
+    fmt = file_format(path)
+    if fmt == "csv":
+        with pd.read_csv(path, chunksize=chunk_size) as reader:
+            yield from reader
+    elif fmt == "jsonl":
+        with pd.read_json(path, lines=True, chunksize=chunk_size) as reader:
+            for frame in reader:
+                yield _flatten(frame)
+    else:
+        for batch in _parquet().ParquetFile(path).iter_batches(batch_size=chunk_size):
+            yield batch.to_pandas()
+
+
+def _flatten(frame):
+    """Unpack nested feature objects of JSONL records into columns (nested values win over top-level ones)"""
+    for name in NESTED_FEATURE_FIELDS:
+        if name not in frame.columns or not frame[name].map(lambda v: isinstance(v, dict)).any():
+            continue
+        nested = pd.DataFrame.from_records([v if isinstance(v, dict) else {} for v in frame[name]],
+                                           index=frame.index)
+        frame = pd.concat([frame.drop(columns=[name, *nested.columns], errors="ignore"), nested], axis=1)
+    return frame
+
+
+class ChunkWriter:
+    """Appends scored chunks to the output file as they arrive"""
+
+    def __init__(self, path):
+        self.format = file_format(path)
+        self.path = path
+        self._parquet = None
+        if self.format == "parquet":
+            _parquet()  # без pyarrow падаем до скоринга, а не на первой записи
+        self._file = None if self.format == "parquet" else open(path, "w", newline="", encoding="utf-8")
+        self._header = True
+
+    def write(self, frame):
+        if self.format == "csv":
+            frame.to_csv(self._file, header=self._header, index=False)
+        elif self.format == "jsonl":
+            frame.to_json(self._file, orient="records", lines=True, force_ascii=False)
+        else:
+            import pyarrow
+
+            table = pyarrow.Table.from_pandas(frame, preserve_index=False)
+            if self._parquet is None:
+                self._parquet = _parquet().ParquetWriter(self.path, table.schema)
+            self._parquet.write_table(table)
+        self._header = False
+
+    def close(self):
+        if self._file:
+            self._file.close()
+        if self._parquet:
+            self._parquet.close()
+
+
+# Предиктор загружается один раз на процесс (в пуле - в initializer каждого воркера)
+_predictor = None
+
+
+def _init_worker(models_dir):
+    global _predictor
+    _predictor = CreditScoringPredictor(models_dir)
+
+
+def score_chunk(frame, id_column=None):
+    """Score one input chunk; returns the output chunk (id column + result columns)"""
+    # Нечисловые ячейки -> NaN -> среднее из feature_means, как и пустые
+    features = frame.drop(columns=[id_column], errors="ignore").apply(pd.to_numeric, errors="coerce")
+    out = pd.DataFrame(_predictor.predict_many(features, ignore_unknown=True))
+    if id_column in frame.columns:
+        out.insert(0, id_column, frame[id_column].to_numpy())
+    return out
+
+
+def _check_columns(frame, models_dir, id_column):
+    with open(os.path.join(models_dir, "feature_means.json")) as f:
+        assembler = FeatureAssembler(json.load(f))
+    ignored, known = [], 0
+    for name in frame.columns:
+        try:
+            assembler.column(name)
+            known += 1
+        except UnknownFeatureError:
+            if name != id_column:
+                ignored.append(name)
+    if ignored:
+        logger.warning(f"Ignoring columns the model does not know: {', '.join(map(str, ignored))}")
+    if not known:
+        # Иначе каждая строка получила бы оценку среднего клиента
+        raise ValueError(f"None of the input columns is a model feature "
+                         f"(columns: {', '.join(map(str, frame.columns)) or 'none'})")
+    logger.info(f"{known} of {len(assembler.features)} model features present in the input, "
+                f"the rest are filled from feature_means.json")
+
+
+def score_file(input_path, output_path, models_dir="models", chunk_size=50000, workers=1, id_column="client_id"):
+    """Stream input_path through the predictor into output_path; returns the number of rows scored.
+
+    Raises ValueError (before the output is created) if the input has no model feature columns.
+    """
+    chunks = read_chunks(input_path, chunk_size)
+    first = next(chunks, None)
+    if first is not None:
+        _check_columns(first, models_dir, id_column)
+    writer = ChunkWriter(output_path)
+    rows, started = 0, time.perf_counter()
+
+    def emit(out):
+        nonlocal rows
+        writer.write(out)
+        rows += len(out)
+        logger.info(f"Scored {rows} rows ({rows / (time.perf_counter() - started):.0f} rows/s)")
+
+    try:
+        if first is None:
+            return 0
+
+        if workers <= 1:
+            _init_worker(models_dir)
+            emit(score_chunk(first, id_column))
+            for frame in chunks:
+                emit(score_chunk(frame, id_column))
+        else:
+            with ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context("spawn"),
+                                     initializer=_init_worker, initargs=(models_dir,)) as pool:
+                # Не больше 2 чанков на воркер в полете: чтение не убегает вперед записи
+                pending = deque([pool.submit(score_chunk, first, id_column)])
+                for frame in chunks:
+                    pending.append(pool.submit(score_chunk, frame, id_column))
+                    if len(pending) >= workers * 2:
+                        emit(pending.popleft().result())
+                while pending:
+                    emit(pending.popleft().result())
+    finally:
+        writer.close()
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Score a CSV / JSONL / Parquet file of clients offline")
+    parser.add_argument("input")
+    parser.add_argument("output", help="output file; the format follows the extension")
+    parser.add_argument("--models-dir", default="models")
+    parser.add_argument("--chunk-size", type=int, default=50000)
+    parser.add_argument("--workers", type=int, default=1,
+                        help="processes scoring chunks in parallel (pays off when scoring, not parsing, dominates)")
+    parser.add_argument("--id-column", default="client_id", help="input column copied to the output")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+
+    try:
+        rows = score_file(args.input, args.output, args.models_dir, args.chunk_size, args.workers, args.id_column)
+    except ValueError as e:
+        parser.exit(1, f"error: {e}\n")
+    print(f"Scored {rows} rows into {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+import asyncio
+
+import numpy as np
+
+from app.metrics import MICRO_BATCH_SIZE, MICRO_BATCH_WAIT
+
+BATCH_SIZE_BUCKETS = MICRO_BATCH_SIZE.buckets
+
+
+class MicroBatcher:
+    """Collects concurrent single-row requests into one matrix and scores them in one pass"""
+
+    def __init__(self, runner, max_batch=64, max_wait=0.002):
+        # runner: async fn(fn, *args), e.g. InferenceExecutor.run
+        self.runner = runner
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        # Всё состояние меняется только из потока event loop - блокировки не нужны
+        self._pending = []
+        self._timer = None
+        # Цикл событий держит задачи только по слабым ссылкам: без этого множества
+        # летящий батч может собрать GC, и его ожидающие повиснут
+        self._tasks = set()
+
+        self.batches = 0
+        self.requests = 0
+        self.max_batch_seen = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self.size_histogram = [0] * (len(BATCH_SIZE_BUCKETS) + 1)
+
+    async def submit(self, vector, engine):
+        """Score one raw feature vector with `engine` -> (credit_score, default_probability)"""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((vector, engine, future, loop.time()))
+        if len(self._pending) >= self.max_batch:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_wait, self._flush)
+        return await future
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        # Во время смены модели в окне могут оказаться запросы к двум версиям - скорим их раздельно
+        groups = {}
+        for item in batch:
+            groups.setdefault(id(item[1]), []).append(item)
+        for group in groups.values():
+            task = asyncio.ensure_future(self._run(group))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch):
+        now = asyncio.get_running_loop().time()
+        self._record(len(batch), [now - enqueued for _, _, _, enqueued in batch])
+        engine = batch[0][1]
+        try:
+            scores, probs = await self.runner(engine.score_many, np.vstack([v for v, _, _, _ in batch]))
+        except Exception as e:
+            for _, _, future, _ in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for i, (_, _, future, _) in enumerate(batch):
+            if not future.done():  # клиент мог отключиться
+                future.set_result((float(scores[i]), float(probs[i])))
+
+    def _record(self, size, waits):
+        self.batches += 1
+        self.requests += size
+        self.max_batch_seen = max(self.max_batch_seen, size)
+        self.wait_total += sum(waits)
+        self.wait_max = max(self.wait_max, max(waits))
+        self.size_histogram[int(np.searchsorted(BATCH_SIZE_BUCKETS, size))] += 1
+        MICRO_BATCH_SIZE.observe(size)
+        for wait in waits:
+            MICRO_BATCH_WAIT.observe(wait)
+
+    def stats(self):
+        return {
+            "batches": self.batches,
+            "requests": self.requests,
+            "avg_batch_size": round(self.requests / self.batches, 2) if self.batches else None,
+            "max_batch_size": self.max_batch_seen,
+            "avg_wait_ms": round(self.wait_total / self.requests * 1000, 3) if self.requests else None,
+            "max_wait_ms": round(self.wait_max * 1000, 3),
+            "batch_size_histogram": {
+                "le": [str(b) for b in BATCH_SIZE_BUCKETS] + ["+Inf"],
+                "counts": list(self.size_histogram),
+            },
+        }
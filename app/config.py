@@ -0,0 +1,66 @@
+import os
+
+# Путь к базе портфеля (SQLite)
+PORTFOLIO_DB = os.environ.get("PORTFOLIO_DB", "portfolio.db")
+
+# Каталог с моделью, выгруженной лаунчером (app.serve) в компактном формате (model.json + model.f64);
+# если задан, воркеры не загружают joblib-артефакты сами и не следят за новыми версиями
+# (новую модель раскатывает мастер по SIGHUP)
+SHARED_MODEL_DIR = os.environ.get("CREDIT_SCORE_SHARED_MODEL")
+
+# Пул потоков для скоринга: сколько задач выполняется параллельно и сколько может ждать
+# в очереди, прежде чем /predict начнет отвечать 503
+INFERENCE_WORKERS = int(os.environ.get("INFERENCE_WORKERS", min(4, os.cpu_count() or 1)))
+INFERENCE_QUEUE = int(os.environ.get("INFERENCE_QUEUE", 256))
+INFERENCE_RETRY_AFTER = int(os.environ.get("INFERENCE_RETRY_AFTER", 1))
+
+# Микробатчинг одиночных /predict: запросы, пришедшие в течение окна, скорятся одной матрицей
+MICROBATCH_ENABLED = os.environ.get("MICROBATCH_ENABLED", "0") == "1"
+MICROBATCH_MAX_SIZE = int(os.environ.get("MICROBATCH_MAX_SIZE", 64))
+MICROBATCH_MAX_WAIT_MS = float(os.environ.get("MICROBATCH_MAX_WAIT_MS", 2))
+
+# Логи: уровень, формат (json | text) и доля запросов, для которых пишется дамп вектора признаков
+LOG_LEVEL = os.environ.get("LOG_LEVEL", "INFO").upper()
+LOG_FORMAT = os.environ.get("LOG_FORMAT", "json")
+FEATURE_DUMP_SAMPLE_RATE = float(os.environ.get("FEATURE_DUMP_SAMPLE_RATE", 0))
+
+# Кэш результатов скоринга по вектору признаков (0 - выключен)
+PREDICTION_CACHE_SIZE = int(os.environ.get("PREDICTION_CACHE_SIZE", 10000))
+PREDICTION_CACHE_TTL = float(os.environ.get("PREDICTION_CACHE_TTL", 300))
+
+# Реестр моделей: models/<version>/ (или плоский models/) и период проверки новых версий, сек (0 - не следить)
+MODELS_DIR = os.environ.get("MODELS_DIR", "models")
+MODEL_WATCH_INTERVAL = float(os.environ.get("MODEL_WATCH_INTERVAL", 30))
+
+# What-if сценарии (/predict/scenarios): максимум точек сетки в одном запросе
+SCENARIO_MAX_POINTS = int(os.environ.get("SCENARIO_MAX_POINTS", 100000))
+
+# Разложение по признакам (/predict/explain/batch): максимум клиентов в одном запросе;
+# ответ на клиента в десятки раз больше, чем у /predict/batch
+EXPLAIN_MAX_CLIENTS = int(os.environ.get("EXPLAIN_MAX_CLIENTS", 10000))
+
+# Мониторинг дрейфа входных данных: включен ли, период пересчета отчета, сек, и порог PSI для тревоги
+DRIFT_MONITOR_ENABLED = os.environ.get("DRIFT_MONITOR_ENABLED", "1") == "1"
+DRIFT_REPORT_INTERVAL = float(os.environ.get("DRIFT_REPORT_INTERVAL", 60))
+DRIFT_PSI_ALERT = float(os.environ.get("DRIFT_PSI_ALERT", 0.25))
+
+# Аудит решений: каталог сегментов (gzip JSONL), очередь в памяти, размер пачки и период записи, мс,
+# ротация сегмента по размеру, МБ, и возрасту, сек; при полной очереди drop - запись теряется
+# (и считается), reject - запрос получает 503; fsync после каждой пачки и уровень сжатия gzip
+# (1 - почти втрое дешевле по CPU, чем 6, при файлах в ~1.7 раза больше)
+AUDIT_ENABLED = os.environ.get("AUDIT_ENABLED", "1") == "1"
+AUDIT_DIR = os.environ.get("AUDIT_DIR", "audit")
+AUDIT_QUEUE_SIZE = int(os.environ.get("AUDIT_QUEUE_SIZE", 100000))
+AUDIT_BATCH_SIZE = int(os.environ.get("AUDIT_BATCH_SIZE", 1000))
+AUDIT_FLUSH_INTERVAL_MS = float(os.environ.get("AUDIT_FLUSH_INTERVAL_MS", 200))
+AUDIT_SEGMENT_MB = float(os.environ.get("AUDIT_SEGMENT_MB", 64))
+AUDIT_SEGMENT_SECONDS = float(os.environ.get("AUDIT_SEGMENT_SECONDS", 3600))
+AUDIT_ON_FULL = os.environ.get("AUDIT_ON_FULL", "drop")
+AUDIT_FSYNC = os.environ.get("AUDIT_FSYNC", "1") == "1"
+AUDIT_COMPRESSLEVEL = int(os.environ.get("AUDIT_COMPRESSLEVEL", 1))
+
+# Политика решений: верхние границы вероятности дефолта для всех полос, кроме последней,
+# и уровни риска / решения по полосам (по одному на полосу)
+RISK_THRESHOLDS = [float(t) for t in os.environ.get("RISK_THRESHOLDS", "0.10,0.25").split(",")]
+RISK_LEVELS = os.environ.get("RISK_LEVELS", "Low,Medium,High").split(",")
+RISK_DECISIONS = os.environ.get("RISK_DECISIONS", "APPROVE,REVIEW,REJECT").split(",")
@@ -0,0 +1,72 @@
+from bisect import bisect_left
+
+import numpy as np
+
+from app import config
+
+APPROVE = "APPROVE"
+
+DESCRIPTIONS = {
+    "Low": "Low risk - Recommended for approval",
+    "Medium": "Medium risk - Requires review",
+    "High": "High risk - Not recommended",
+}
+
+
+class DecisionPolicy:
+    """Default-probability bands -> (risk level, decision), shared by the API, batch and offline scoring.
+
+    thresholds are the upper bounds of every band but the last; a probability equal to a
+    threshold stays in the lower band (0.25 with the default 0.10/0.25 policy is Medium).
+    """
+
+    def __init__(self, thresholds, levels=("Low", "Medium", "High"), decisions=(APPROVE, "REVIEW", "REJECT")):
+        thresholds = [float(t) for t in thresholds]
+        if thresholds != sorted(thresholds) or not all(0 < t < 1 for t in thresholds):
+            raise ValueError(f"Risk thresholds must be increasing probabilities in (0, 1), got {thresholds}")
+        if not len(levels) == len(decisions) == len(thresholds) + 1:
+            raise ValueError(f"{len(thresholds)} thresholds need {len(thresholds) + 1} risk levels and decisions, "
+                             f"got {len(levels)} and {len(decisions)}")
+        self.thresholds = thresholds
+        self.levels = list(levels)
+        self.decisions = list(decisions)
+        self._bounds = np.array(thresholds)
+        self._levels = np.array(self.levels)
+        self._decisions = np.array(self.decisions)
+
+    @classmethod
+    def from_config(cls):
+        return cls(config.RISK_THRESHOLDS, config.RISK_LEVELS, config.RISK_DECISIONS)
+
+    def decide(self, default_prob):
+        """One probability -> (risk_level, decision); bisect is cheaper than numpy for a scalar"""
+        band = bisect_left(self.thresholds, default_prob)
+        return self.levels[band], self.decisions[band]
+
+    def bands(self, default_probs):
+        """Probability array -> band index array (0 = lowest risk) in a single searchsorted"""
+        return np.searchsorted(self._bounds, default_probs, side="left")
+
+    def approved(self, bands):
+        """Band index array -> bool array, True where the band's decision is APPROVE"""
+        return self._decisions[bands] == APPROVE
+
+    def decide_many(self, default_probs):
+        """Probability array -> (risk_level array, decision array)"""
+        band = self.bands(default_probs)
+        return self._levels[band], self._decisions[band]
+
+    def describe(self):
+        """Bands in percent, in the shape /statistics has always returned"""
+        bounds = [t * 100 for t in self.thresholds]
+        bands = {}
+        for i, (level, decision) in enumerate(zip(self.levels, self.decisions)):
+            band = {}
+            if i > 0:
+                band["min_default_probability"] = bounds[i - 1]
+            if i < len(bounds):
+                band["max_default_probability"] = bounds[i]
+            band["decision"] = decision
+            band["description"] = DESCRIPTIONS.get(level, f"{level} risk")
+            bands[level.lower()] = band
+        return bands
@@ -0,0 +1,260 @@
+"""Streaming input-distribution monitoring: how far live traffic has moved from the training data.
+
+Every scored feature vector is copied into a per-thread buffer (the same sharding as
+app.metrics: only the owning thread writes, no lock on the scoring path). A full buffer
+is folded into the thread's statistics in one vectorized pass: Welford/Chan mean and
+variance (in training z units, clipped at Z_CLIP so an extreme value cannot overflow
+them), min/max, a fixed-bin histogram per feature and how often the value equals the
+feature_means.json default, i.e. was not sent and filled in. Memory is constant:
+features x bins per thread.
+
+The training data is not shipped with the model, only the scaler mean/std, so the PSI
+baseline is a normal distribution with those moments: PSI is computed over unit-wide
+bins in z-space (training std units) with the expected shares taken from that normal.
+Binary features (training mean p in (0, 1) with std exactly sqrt(p(1-p))) are compared
+with Bernoulli(p) instead, using the live share of ones. Other categorical features
+(CAT_*) have no usable baseline: their psi is null, they never count as drifted and
+mean_shift is the number to look at. For heavily skewed continuous features PSI stays
+a coarse signal.
+"""
+import asyncio
+import logging
+import math
+import threading
+import time
+from datetime import datetime, timezone
+from statistics import NormalDist
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+FLUSH_ROWS = 256
+BATCH_SAMPLE_ROWS = 4096  # больший батч прореживается до стольких строк (с весом)
+PSI_EPSILON = 1e-4
+PSI_MIN_ROWS = 1000  # на меньшем окне PSI - в основном шум, о дрейфе не сообщаем
+CATEGORICAL_PREFIX = "CAT_"
+QUANTILES = (0.05, 0.5, 0.95)
+
+# Корзины скетча в z-пространстве: шаг 1/8 на [-4, 4] плюс две открытые крайние;
+# равная ширина - номер корзины считается арифметикой, без поиска по границам
+Z_LIMIT, Z_STEP = 4.0, 0.125
+Z_EDGES = np.arange(-Z_LIMIT, Z_LIMIT + Z_STEP / 2, Z_STEP)
+SKETCH_BINS = len(Z_EDGES) + 1
+# Отсечка z для моментов: дальше значение - заведомый выброс, а квадрат не переполнится
+Z_CLIP = 1e6
+# Корзины PSI: (-inf, -3), [-3, -2), ..., [3, inf); группы - по индексу первой корзины скетча
+PSI_EDGES = np.arange(-3.0, 3.5, 1.0)
+PSI_GROUPS = np.concatenate([[0], np.searchsorted(Z_EDGES, PSI_EDGES) + 1])
+PSI_EXPECTED = np.diff([0.0, *(NormalDist().cdf(e) for e in PSI_EDGES), 1.0])
+
+
+class _Shard:
+    """Rows buffered by one thread plus its folded statistics"""
+
+    def __init__(self, n_features):
+        self.buffer = np.empty((FLUSH_ROWS, n_features))
+        self.pending = 0
+        # (count, mean, m2, minimum, maximum, histogram, defaulted); mean и m2 - в z-единицах - заменяется целиком,
+        # так что сборщик в другом потоке всегда видит согласованный набор
+        self.stats = None
+
+
+class _Window:
+    """Statistics of one model version since it started serving"""
+
+    def __init__(self, bundle):
+        self.version = bundle.version
+        self.features = bundle.assembler.features
+        self.train_mean = bundle.engine.mean
+        self.train_std = bundle.engine.scale
+        self.defaults = np.asarray(bundle.assembler.defaults)
+        # Обучающие значения были 0/1, если std scaler'а совпадает с std Бернулли при p = mean
+        p = self.train_mean
+        self.binary = (p > 0) & (p < 1) & np.isclose(self.train_std, np.sqrt(np.clip(p * (1 - p), 0, None)),
+                                                     rtol=1e-6)
+        # Прочие категориальные: уровни неизвестны, ни нормальная, ни бернуллиевская база не годится
+        self.unscored = np.array([name.startswith(CATEGORICAL_PREFIX) for name in self.features]) & ~self.binary
+        self.started = datetime.now(timezone.utc).isoformat()
+        self._offsets = np.arange(len(self.features)) * SKETCH_BINS
+        self._local = threading.local()
+        self._shards = []
+        self._lock = threading.Lock()  # только при первом обращении потока и при сборе
+
+    def shard(self):
+        try:
+            return self._local.shard
+        except AttributeError:
+            shard = self._local.shard = _Shard(len(self.features))
+            with self._lock:
+                self._shards.append(shard)
+            return shard
+
+    def fold(self, stats, rows, weight=1.0):
+        """Merge a block of rows, each standing for weight rows, into stats (None = empty) -> new stats"""
+        if not len(rows):
+            return stats
+        n = len(rows) * weight
+        # Моменты - в z-пространстве с отсечкой: одно значение вроде 1e200 не переполнит квадраты
+        with np.errstate(over="ignore"):
+            z = (rows - self.train_mean) / self.train_std
+        np.clip(z, -Z_CLIP, Z_CLIP, out=z)
+        moments = (z.mean(axis=0), z.var(axis=0) * n)
+        z += Z_LIMIT + Z_STEP
+        z *= 1 / Z_STEP
+        np.clip(z, 0, SKETCH_BINS - 1, out=z)
+        bins = z.astype(np.intp) + self._offsets
+        histogram = np.bincount(bins.ravel(), minlength=len(self._offsets) * SKETCH_BINS) * weight
+        block = (n, *moments, rows.min(axis=0), rows.max(axis=0),
+                 histogram.reshape(-1, SKETCH_BINS), (rows == self.defaults).sum(axis=0) * weight)
+        return block if stats is None else _merge(stats, block)
+
+    def snapshot(self):
+        with self._lock:
+            shards = list(self._shards)
+        total = None
+        for shard in shards:
+            # Строка попадает в pending только после того, как целиком записана в буфер
+            stats, pending = shard.stats, shard.pending
+            if stats is not None:
+                total = stats if total is None else _merge(total, stats)
+            total = self.fold(total, shard.buffer[:pending].copy())
+        return total
+
+
+def _merge(a, b):
+    """Chan et al. pairwise update of (count, mean, m2, ...) tuples"""
+    count = a[0] + b[0]
+    delta = b[1] - a[1]
+    mean = a[1] + delta * (b[0] / count)
+    m2 = a[2] + b[2] + delta ** 2 * (a[0] * b[0] / count)
+    return (count, mean, m2, np.minimum(a[3], b[3]), np.maximum(a[4], b[4]), a[5] + b[5], a[6] + b[6])
+
+
+def _finite(value, digits=None):
+    """numpy scalar -> float for the JSON report; None if it is not finite (JSON has no NaN/inf)"""
+    value = float(value)
+    if not math.isfinite(value):
+        return None
+    return value if digits is None else round(value, digits)
+
+
+def _quantiles(histogram, low, high):
+    """Sketch histogram -> z-values of QUANTILES; the open end bins are bounded by the observed min/max"""
+    edges = np.concatenate([[min(low, Z_EDGES[0])], Z_EDGES, [max(high, Z_EDGES[-1])]])
+    cumulative = np.concatenate([[0], np.cumsum(histogram)]) / histogram.sum()
+    return np.clip(np.interp(QUANTILES, cumulative, edges), low, high)
+
+
+class DriftMonitor:
+    """Per-feature streaming statistics of the scored traffic and PSI against the training baseline"""
+
+    def __init__(self, psi_alert=0.25):
+        self.psi_alert = psi_alert
+        self._window = None
+        self._lock = threading.Lock()
+        self.report = None
+
+    def _current(self, bundle):
+        window = self._window
+        if window is None or window.version != bundle.version:
+            with self._lock:
+                # Новая версия модели - новое окно: базовая линия у нее своя
+                if self._window is None or self._window.version != bundle.version:
+                    self._window = _Window(bundle)
+                window = self._window
+        return window
+
+    def observe(self, bundle, row):
+        """One feature vector from the scoring path: a buffer copy, a vectorized fold every FLUSH_ROWS"""
+        window = self._current(bundle)
+        shard = window.shard()
+        shard.buffer[shard.pending] = row
+        shard.pending += 1
+        if shard.pending == FLUSH_ROWS:
+            stats = window.fold(shard.stats, shard.buffer.copy())
+            # Сначала обнуляем pending: сборщик на мгновение недосчитает строки, но не посчитает дважды
+            shard.pending = 0
+            shard.stats = stats
+
+    def observe_many(self, bundle, matrix):
+        """A batch of feature vectors, folded straight into the thread's statistics.
+
+        Batches above BATCH_SAMPLE_ROWS are thinned to an evenly strided sample whose rows
+        carry the weight of the rows skipped, so a 10^6-row batch costs as much as a small one.
+        """
+        window = self._current(bundle)
+        shard = window.shard()
+        step = -(-len(matrix) // BATCH_SAMPLE_ROWS)
+        rows = np.asarray(matrix[::step] if step > 1 else matrix, dtype=np.float64)
+        shard.stats = window.fold(shard.stats, rows, len(matrix) / len(rows) if len(rows) else 1.0)
+
+    def compute(self):
+        """Fold all shards and compute per-feature statistics and PSI -> report dict (also kept in .report)"""
+        window = self._window
+        computed_at = datetime.now(timezone.utc).isoformat()
+        stats = window.snapshot() if window is not None else None
+        if stats is None:
+            self.report = {"model_version": getattr(window, "version", None), "observed": 0,
+                           "window_started": getattr(window, "started", None), "computed_at": computed_at,
+                           "features": {}, "drifted": []}
+            return self.report
+
+        count, shift, m2, minimum, maximum, histogram, defaulted = stats
+        mean = window.train_mean + window.train_std * shift
+        std = window.train_std * np.sqrt(m2 / count)
+        actual = np.maximum(np.add.reduceat(histogram, PSI_GROUPS, axis=1) / count, PSI_EPSILON)
+        psi = ((actual - PSI_EXPECTED) * np.log(actual / PSI_EXPECTED)).sum(axis=1)
+        # Бинарные: две ячейки {0, 1}, доля единиц в живом трафике - его среднее
+        p = np.clip(window.train_mean, PSI_EPSILON, 1 - PSI_EPSILON)
+        q = np.clip(mean, PSI_EPSILON, 1 - PSI_EPSILON)
+        psi = np.where(window.binary, (q - p) * np.log(q / p) + (p - q) * np.log((1 - q) / (1 - p)), psi)
+        with np.errstate(over="ignore"):
+            z_low = np.clip((minimum - window.train_mean) / window.train_std, -Z_CLIP, Z_CLIP)
+            z_high = np.clip((maximum - window.train_mean) / window.train_std, -Z_CLIP, Z_CLIP)
+
+        features = {}
+        for j, name in enumerate(window.features):
+            quantiles = window.train_mean[j] + window.train_std[j] * _quantiles(histogram[j], z_low[j], z_high[j])
+            features[name] = {
+                "mean": _finite(mean[j]),
+                "std": _finite(std[j]),
+                "train_mean": float(window.train_mean[j]),
+                "train_std": float(window.train_std[j]),
+                "mean_shift": _finite(shift[j], 4),
+                "min": _finite(minimum[j]),
+                "max": _finite(maximum[j]),
+                **{f"p{round(q * 100):02d}": _finite(v) for q, v in zip(QUANTILES, quantiles)},
+                "defaulted_rate": round(float(defaulted[j] / count), 4),
+                "psi": None if window.unscored[j] else _finite(psi[j], 4),
+                "psi_baseline": None if window.unscored[j] else "bernoulli" if window.binary[j] else "normal",
+            }
+        drifted = []
+        if count >= PSI_MIN_ROWS:
+            drifted = sorted((name for name, f in features.items()
+                              if f["psi"] is not None and f["psi"] >= self.psi_alert),
+                             key=lambda name: -features[name]["psi"])
+        self.report = {
+            "model_version": window.version,
+            "observed": int(count),
+            "window_started": window.started,
+            "computed_at": computed_at,
+            "psi_alert": self.psi_alert,
+            "drifted": drifted,
+            "features": features,
+        }
+        return self.report
+
+    async def watch(self, interval):
+        """Recompute the report every interval seconds off the event loop"""
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                started = time.perf_counter()
+                report = await asyncio.to_thread(self.compute)
+                if report["drifted"]:
+                    logger.warning(f"Input drift (PSI >= {self.psi_alert}) in {len(report['drifted'])} features: "
+                                   f"{', '.join(report['drifted'][:10])}")
+                logger.debug(f"Drift report computed in {time.perf_counter() - started:.3f}s")
+            except Exception as e:
+                logger.error(f"Drift report failed: {e}")
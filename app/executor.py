@@ -0,0 +1,32 @@
+import asyncio
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+
+
+class ExecutorSaturated(Exception):
+    """Raised when the inference queue is full; the caller should retry later"""
+
+
+class InferenceExecutor:
+    """Bounded thread pool for CPU-bound scoring, awaited from the event loop"""
+
+    def __init__(self, max_workers, max_queue):
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="inference")
+        self.max_workers = max_workers
+        self.max_pending = max_workers + max_queue
+        # Меняется только из потока event loop, поэтому без блокировки
+        self.pending = 0
+
+    async def run(self, fn, *args):
+        if self.pending >= self.max_pending:
+            raise ExecutorSaturated(f"{self.pending} scoring jobs pending")
+        self.pending += 1
+        try:
+            # run_in_executor не переносит contextvars (request id для логов) - копируем контекст сами
+            ctx = contextvars.copy_context()
+            return await asyncio.get_running_loop().run_in_executor(self._pool, ctx.run, fn, *args)
+        finally:
+            self.pending -= 1
+
+    def shutdown(self):
+        self._pool.shutdown(wait=True)
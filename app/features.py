@@ -0,0 +1,166 @@
+import math
+import re
+
+import numpy as np
+
+# Поля ClientData, имена которых не совпадают с признаками модели
+FEATURE_ALIASES = {
+    "EXPENDITURE": "T_EXPENDITURE_12",
+    "CREDIT_CARD": "CAT_CREDIT_CARD",
+    "MORTGAGE": "CAT_MORTGAGE",
+    "DEPENDENTS": "CAT_DEPENDENTS",
+}
+
+COMPLETE_BLOCK = 1024
+
+# Итоги трат за 12 месяцев; категория - все, что между T_ и _12
+_CATEGORY_TOTAL = re.compile(r"T_(\w+)_12")
+
+
+def derived_ratios(features):
+    """Ratio features that are plain quotients of raw totals -> [(ratio, numerator, denominator)].
+
+    Only ratios whose name and both inputs are in features are returned:
+    R_<CAT> = T_<CAT>_6 / T_<CAT>_12, R_<CAT>_<BASE> = T_<CAT>_12 / BASE for INCOME, SAVINGS
+    and DEBT, plus R_SAVINGS_INCOME, R_DEBT_INCOME and R_DEBT_SAVINGS.
+    """
+    rules = [("R_SAVINGS_INCOME", "SAVINGS", "INCOME"), ("R_DEBT_INCOME", "DEBT", "INCOME"),
+             ("R_DEBT_SAVINGS", "DEBT", "SAVINGS")]
+    for name in features:
+        match = _CATEGORY_TOTAL.fullmatch(name)
+        if match:
+            category = match.group(1)
+            rules.append((f"R_{category}", f"T_{category}_6", name))
+            rules.extend((f"R_{category}_{base}", name, base) for base in ("INCOME", "SAVINGS", "DEBT"))
+    known = set(features)
+    return [rule for rule in rules if known.issuperset(rule)]
+
+
+class UnknownFeatureError(ValueError):
+    """Raised when a client payload contains a key the model does not know"""
+
+    def __init__(self, key):
+        super().__init__(f"Unknown feature: {key}")
+        self.key = key
+
+
+class FeatureAssembler:
+    """Frozen default vector and name -> column index, built once from feature_means.json"""
+
+    def __init__(self, feature_means, defaults=None):
+        self.features = list(feature_means["features"])
+        self.index = {name: i for i, name in enumerate(self.features)}
+        for alias, target in FEATURE_ALIASES.items():
+            if target in self.index:
+                self.index[alias] = self.index[target]
+        # Ключи в нижнем регистре тоже принимаем, без upper() на каждый запрос
+        self.index.update({name.lower(): i for name, i in list(self.index.items())})
+
+        if defaults is None:
+            defaults = np.array([feature_means[k] for k in self.features], dtype=np.float64)
+        # defaults may be a read-only memory map shared between worker processes
+        self.defaults = defaults
+        self.defaults.flags.writeable = False
+
+        ratios = derived_ratios(self.features)
+        self.derived = [ratio for ratio, _, _ in ratios]
+        self._ratio, self._numerator, self._denominator = (
+            np.array([self.index[rule[k]] for rule in ratios], dtype=np.intp) for k in range(3))
+        # Для одиночного клиента: числитель -> [(отношение, знаменатель)]
+        self._ratios_of = {}
+        for ratio, numerator, denominator in ratios:
+            self._ratios_of.setdefault(self.index[numerator], []).append((self.index[ratio], self.index[denominator]))
+
+    def column(self, key):
+        j = self.index.get(key)
+        if j is None and isinstance(key, str):
+            j = self.index.get(key.upper())
+        if j is None:
+            raise UnknownFeatureError(key)
+        return j
+
+    def complete(self, matrix):
+        """Fill an (N, n_features) matrix in place, NaN marking the cells the client did not send.
+
+        Ratios the client left out are derived from the totals it did send, all in one pass;
+        a zero or missing denominator, and every other missing cell, gets the default.
+        """
+        self._complete_t(matrix.T)
+        return matrix
+
+    def _complete_t(self, matrix_t):
+        # Раскладка признак x клиент; блоками по клиентам, чтобы временные массивы жили в кэше
+        for start in range(0, matrix_t.shape[1], COMPLETE_BLOCK):
+            block = matrix_t[:, start:start + COMPLETE_BLOCK]
+            if self.derived:
+                denominators = block[self._denominator]
+                ratios = np.divide(block[self._numerator], denominators,
+                                   out=np.full(denominators.shape, np.nan), where=denominators != 0)
+                sent = block[self._ratio]
+                # Присланное клиентом отношение не трогаем; NaN во входах дает NaN и уходит в умолчание
+                block[self._ratio] = np.where(np.isnan(sent), ratios, sent)
+            np.copyto(block, self.defaults[:, None], where=np.isnan(block))
+
+    def _scatter(self, row, values):
+        for key, value in values.items():
+            number = float(value)
+            # NaN в матрице - внутренняя метка "не прислан"; присланный клиентом NaN/inf - ошибка
+            if not math.isfinite(number):
+                raise ValueError(f"feature values must be finite numbers, got {key}={value!r}")
+            row[self.column(key)] = number
+
+    def vector(self, values):
+        """One client: same result as complete(), but a few dict lookups instead of array passes"""
+        sent = {self.column(key): float(value) for key, value in values.items()}
+        row = self.defaults.copy()
+        for column, value in sent.items():
+            row[column] = value
+        for numerator, value in sent.items():
+            for ratio, denominator in self._ratios_of.get(numerator, ()):
+                if ratio not in sent and sent.get(denominator):
+                    row[ratio] = value / sent[denominator]
+        return row
+
+    def matrix(self, records):
+        """Fill records into one (N, n_features) matrix; bad rows keep the defaults and get an error"""
+        matrix = np.full((len(records), len(self.features)), np.nan)
+        errors = [None] * len(records)
+        for i, record in enumerate(records):
+            try:
+                if not isinstance(record, dict):
+                    raise ValueError("client must be an object of feature values")
+                self._scatter(matrix[i], record)
+            except (TypeError, ValueError) as e:
+                matrix[i] = np.nan
+                errors[i] = str(e)
+        # Производные отношения и умолчания - одним проходом по всему батчу
+        return self.complete(matrix), errors
+
+
+    def column_matrix(self, columns, ignore_unknown=False):
+        """Columnar input (name -> values, e.g. a dict of arrays or a DataFrame) -> (N, n_features) matrix.
+
+        Missing columns and NaN cells are completed like in complete(); values that are not
+        numbers, and two columns naming the same feature (income and INCOME), raise ValueError.
+        """
+        names = list(columns.keys())
+        n = len(columns[names[0]]) if names else 0
+        # Заполняем по столбцам (непрерывные строки транспонированной матрицы), отдаем вид .T
+        matrix_t = np.full((len(self.features), n), np.nan)
+        seen = {}
+        for name in names:
+            try:
+                j = self.column(name)
+            except UnknownFeatureError:
+                if ignore_unknown:
+                    continue
+                raise
+            if j in seen:
+                raise ValueError(f"Columns {seen[j]!r} and {name!r} are both feature {self.features[j]}")
+            seen[j] = name
+            values = np.asarray(columns[name], dtype=np.float64)
+            if values.shape != (n,):
+                raise ValueError(f"Column {name} has {len(values)} values, expected {n}")
+            matrix_t[j] = values
+        self._complete_t(matrix_t)
+        return matrix_t.T
@@ -0,0 +1,61 @@
+import contextvars
+import json
+import logging
+import logging.handlers
+import queue
+import random
+from datetime import datetime, timezone
+
+from app import config
+
+request_id_var = contextvars.ContextVar("request_id", default=None)
+
+
+class RequestIdFilter(logging.Filter):
+    """Stamps the current request id on the record in the calling thread, before it is queued"""
+
+    def filter(self, record):
+        record.request_id = request_id_var.get()
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record):
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+            "request_id": getattr(record, "request_id", None),
+        }
+        # Структурированные поля передаются через extra={"fields": {...}}
+        entry.update(getattr(record, "fields", None) or {})
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+def setup_logging(level=config.LOG_LEVEL, fmt=config.LOG_FORMAT):
+    """Route the root logger through a queue; a background listener does the actual stdout writes"""
+    log_queue = queue.SimpleQueue()
+    queue_handler = logging.handlers.QueueHandler(log_queue)
+    queue_handler.addFilter(RequestIdFilter())
+
+    stream = logging.StreamHandler()
+    if fmt == "json":
+        stream.setFormatter(JsonFormatter())
+    else:
+        stream.setFormatter(logging.Formatter("%(levelname)s:%(name)s:%(request_id)s: %(message)s"))
+
+    root = logging.getLogger()
+    root.handlers = [queue_handler]
+    root.setLevel(level)
+    listener = logging.handlers.QueueListener(log_queue, stream)
+    listener.start()
+    return listener
+
+
+def should_dump_features(logger):
+    """Sampling gate for feature-vector debug dumps; a single float comparison when disabled"""
+    rate = config.FEATURE_DUMP_SAMPLE_RATE
+    return rate > 0 and logger.isEnabledFor(logging.DEBUG) and random.random() < rate
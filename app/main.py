@@ -1,11 +1,20 @@
-from fastapi import FastAPI, HTTPException, Body
+from fastapi import FastAPI, HTTPException, Body, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse, StreamingResponse
+import asyncio
 import logging
 from datetime import datetime
 import json
+from typing import Literal, Optional
 import os
+import uuid
 
-from app.api.predict import router as predict_router  # Импортируй router
+from app.api.predict import audit, batcher, cache as prediction_cache, drift, executor as inference_executor, \
+    policy, registry, router as predict_router  # Импортируй router
+from app import config
+from app.logging_config import request_id_var, setup_logging
+from app.metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE, REGISTRY as METRICS_REGISTRY, Gauge, MetricsMiddleware
+from app.portfolio import PortfolioStore
 
 app = FastAPI(
     title="Credit Scoring API",
@@ -25,9 +34,35 @@ app.add_middleware(
 
 app.include_router(predict_router)
 
-logging.basicConfig(level=logging.INFO)
+@app.middleware("http")
+async def request_id_middleware(request: Request, call_next):
+    request_id = request.headers.get("X-Request-ID") or uuid.uuid4().hex
+    token = request_id_var.set(request_id)
+    try:
+        response = await call_next(request)
+    finally:
+        request_id_var.reset(token)
+    response.headers["X-Request-ID"] = request_id
+    return response
+
+# Добавлен последним - самый внешний слой, меряет запрос целиком
+app.add_middleware(MetricsMiddleware)
+
+log_listener = setup_logging()
 logger = logging.getLogger(__name__)
 PORTFOLIO_HISTORY_FILE = "portfolio_history.json"
+DEFAULT_PAGE_SIZE = 100
+portfolio_store = PortfolioStore(config.PORTFOLIO_DB)
+
+# Значения, которые и так где-то хранятся, читаются только в момент сбора /metrics
+Gauge("credit_model_info", "Model version being served", ("version",),
+      function=lambda: {(registry.current.version,): 1})
+Gauge("credit_inference_jobs_pending", "Scoring jobs running or queued on the inference pool",
+      function=lambda: inference_executor.pending)
+Gauge("credit_input_drift_features", "Features whose PSI reached the alert threshold in the last drift report",
+      function=lambda: len(drift.report["drifted"]) if drift is not None and drift.report else 0)
+Gauge("credit_audit_queue_entries", "Audit log entries waiting for the background writer",
+      function=lambda: audit.pending if audit is not None else 0)
 
 @app.get("/", tags=["General"])
 async def root():
@@ -36,103 +71,106 @@ async def root():
         "status": "running",
         "version": "1.0.0",
         "endpoints": [
-            "/docs", "/health", "/predict", "/portfolio/clients",
-            "/portfolio/statistics", "/statistics"
+            "/docs", "/health", "/predict", "/predict/batch", "/predict/explain",
+            "/predict/explain/batch", "/predict/scenarios", "/portfolio/clients",
+            "/portfolio/statistics", "/statistics", "/monitoring/drift", "/metrics"
         ]
     }
 
 @app.get("/health", tags=["General"])
 async def health_check():
-    return {
+    health = {
         "status": "healthy",
         "timestamp": datetime.now().isoformat(),
-        "version": "1.0.0"
+        "version": "1.0.0",
+        "model_version": registry.current.version
     }
+    if batcher is not None:
+        health["micro_batching"] = batcher.stats()
+    if prediction_cache is not None:
+        health["prediction_cache"] = prediction_cache.stats()
+    if audit is not None:
+        health["audit"] = audit.stats()
+    return health
+
+@app.get("/metrics", tags=["General"], response_class=PlainTextResponse)
+async def metrics():
+    return PlainTextResponse(METRICS_REGISTRY.render(), media_type=METRICS_CONTENT_TYPE)
+
+def stored_time(value):
+    """Query datetime -> naive local ISO string, the form portfolio timestamps are stored and compared in"""
+    if value is None:
+        return None
+    if value.tzinfo is not None:
+        value = value.astimezone().replace(tzinfo=None)
+    return value.isoformat()
 
+# Обработчики портфеля - обычные def: SQLite и разбор JSON синхронные, FastAPI
+# выполняет их в пуле потоков, а не на цикле событий, где они задерживали бы /predict
 @app.get("/portfolio/clients", tags=["Portfolio"])
-async def get_portfolio_clients():
+def get_portfolio_clients(
+        limit: Optional[int] = Query(None, ge=1, le=1000),
+        cursor: Optional[int] = None,
+        risk_level: Optional[Literal["Low", "Medium", "High"]] = None,
+        decision: Optional[Literal["APPROVE", "REVIEW", "REJECT"]] = None,
+        min_score: Optional[float] = None,
+        max_score: Optional[float] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        format: Literal["json", "ndjson"] = "json"):
+    filters = dict(risk_level=risk_level, decision=decision, min_score=min_score,
+                   max_score=max_score, since=stored_time(since), until=stored_time(until))
+    if format == "ndjson":
+        # Экспорт всего портфеля: строки читаются страницами и отдаются по мере чтения,
+        # одним куском на страницу - итерация синхронного генератора стоит переход в пул потоков
+        pages = portfolio_store.iter_pages(cursor=cursor, limit=limit, **filters)
+        return StreamingResponse(("".join(json.dumps(e) + "\n" for e in entries) for entries in pages),
+                                 media_type="application/x-ndjson")
     try:
-        if os.path.exists(PORTFOLIO_HISTORY_FILE):
-            with open(PORTFOLIO_HISTORY_FILE, "r") as f:
-                history = json.load(f)
-        else:
-            history = []
-        return {"clients": history, "count": len(history)}
+        history, next_cursor = portfolio_store.page(limit or DEFAULT_PAGE_SIZE, cursor, **filters)
+        return {"clients": history, "count": len(history), "next_cursor": next_cursor}
     except Exception as e:
         logger.error(f"Error fetching portfolio history: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/portfolio/clients", tags=["Portfolio"])
+def add_portfolio_client(entry: dict = Body(...)):
+    if "client_id" not in entry:
+        raise HTTPException(status_code=422, detail="client_id is required")
+    try:
+        entry_id = portfolio_store.append(entry)
+        return {"id": entry_id}
+    except Exception as e:
+        logger.error(f"Error recording portfolio entry: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/portfolio/clients/{client_id}", tags=["Portfolio"])
+def get_portfolio_client(client_id: str):
+    history = portfolio_store.client_history(client_id)
+    if not history:
+        raise HTTPException(status_code=404, detail=f"Client {client_id} not found")
+    return {"client_id": client_id, "history": history, "count": len(history)}
+
 @app.get("/portfolio/statistics", tags=["Portfolio"])
-async def get_portfolio_statistics():
+def get_portfolio_statistics(window: Optional[Literal["hour", "day", "30d"]] = None):
     try:
-        if not os.path.exists(PORTFOLIO_HISTORY_FILE):
-            return {"count": 0, "msg": "No portfolio data"}
-        with open(PORTFOLIO_HISTORY_FILE, "r") as f:
-            history = json.load(f)
-        scores, probs = [], []
-        risks = {"Low": 0, "Medium": 0, "High": 0}
-        decisions = {"APPROVE": 0, "REVIEW": 0, "REJECT": 0}
-        score_hist = [0]*6
-        prob_hist = [0]*5
-        for entry in history:
-            res = entry.get("result", {})
-            score = res.get("credit_score")
-            prob = res.get("default_probability")
-            risk = res.get("risk_level")
-            decision = res.get("decision")
-            if isinstance(score, (int, float)):
-                bin_id = min(5, max(0, int((score - 300)//100)))
-                score_hist[bin_id] += 1
-                scores.append(score)
-            if isinstance(prob, (int, float)):
-                bin_id = min(4, max(0, int(prob//20)))
-                prob_hist[bin_id] += 1
-                probs.append(prob)
-            if risk in risks: risks[risk] += 1
-            if decision in decisions: decisions[decision] += 1
-        n = len(history)
-        avg_score = round(sum(scores)/n,2) if n else None
-        avg_prob = round(sum(probs)/n,2) if n else None
-        return {
-            "count": n,
-            "avg_score": avg_score,
-            "avg_default_probability": avg_prob,
-            "risk_distribution": {k: round(v/n*100,2) if n else 0 for k, v in risks.items()},
-            "decision_distribution": {k: round(v/n*100,2) if n else 0 for k, v in decisions.items()},
-            "score_histogram": {
-                "bins": ["300-400","400-500","500-600","600-700","700-800","800+"],
-                "counts": score_hist
-            },
-            "default_probability_histogram": {
-                "bins": ["0-20","20-40","40-60","60-80","80-100"],
-                "counts": prob_hist
-            }
-        }
+        return portfolio_store.statistics(window)
     except Exception as e:
         logger.error(f"Error computing portfolio statistics: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/portfolio/statistics/recompute", tags=["Portfolio"])
+def recompute_portfolio_statistics():
+    try:
+        return portfolio_store.recompute_stats()
+    except Exception as e:
+        logger.error(f"Error recomputing portfolio statistics: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
 @app.get("/statistics", tags=["Analytics"])
 async def get_statistics():
     return {
-        "risk_thresholds": {
-            "low": {
-                "max_default_probability": 30,
-                "decision": "APPROVE",
-                "description": "Low risk - Recommended for approval"
-            },
-            "medium": {
-                "min_default_probability": 30,
-                "max_default_probability": 50,
-                "decision": "REVIEW",
-                "description": "Medium risk - Requires review"
-            },
-            "high": {
-                "min_default_probability": 50,
-                "decision": "REJECT",
-                "description": "High risk - Not recommended"
-            }
-        },
+        "risk_thresholds": policy.describe(),
         "score_range": {
             "min": 300,
             "max": 800,
@@ -140,14 +178,41 @@ async def get_statistics():
         },
     }
 
+@app.get("/monitoring/drift", tags=["Analytics"])
+async def get_drift_report(refresh: bool = False):
+    """Per-feature live statistics and PSI vs the training baseline, as of the last scheduled report"""
+    if drift is None:
+        raise HTTPException(status_code=404, detail="Drift monitoring is disabled (DRIFT_MONITOR_ENABLED=0)")
+    if refresh or drift.report is None:
+        return await asyncio.to_thread(drift.compute)
+    return drift.report
+
 @app.on_event("startup")
 async def startup_event():
     logger.info("🚀 Credit Scoring API started")
     logger.info("📖 Documentation: http://localhost:8000/docs")
+    if not config.SHARED_MODEL_DIR and config.MODEL_WATCH_INTERVAL > 0:
+        app.state.model_watcher = asyncio.create_task(registry.watch(config.MODEL_WATCH_INTERVAL))
+    if drift is not None and config.DRIFT_REPORT_INTERVAL > 0:
+        app.state.drift_watcher = asyncio.create_task(drift.watch(config.DRIFT_REPORT_INTERVAL))
+    if os.path.exists(PORTFOLIO_HISTORY_FILE):
+        imported = portfolio_store.import_json(PORTFOLIO_HISTORY_FILE)
+        if imported:
+            logger.info(f"📥 Imported {imported} entries from {PORTFOLIO_HISTORY_FILE}")
 
 @app.on_event("shutdown")
 async def shutdown_event():
     logger.info("🛑 Credit Scoring API shutting down")
+    if getattr(app.state, "model_watcher", None):
+        app.state.model_watcher.cancel()
+    if getattr(app.state, "drift_watcher", None):
+        app.state.drift_watcher.cancel()
+    inference_executor.shutdown()
+    if audit is not None:
+        # После пула: все принятые решения уже в очереди, дописываем их до выхода
+        audit.close()
+    portfolio_store.close()
+    log_listener.stop()
 
 if __name__ == "__main__":
     import uvicorn
@@ -0,0 +1,289 @@
+"""Prometheus text-format metrics cheap enough to stay on at full load.
+
+Counters and histograms keep one shard per thread (the event loop and every
+inference thread), so inc()/observe() only touch the calling thread's list and
+never take a lock; /metrics sums the shards at scrape time. Label sets are bound
+once with .labels(...) and the child is kept, so the hot path skips the lookup.
+Gauges are written from the event loop only or read from a callback at scrape.
+Each process has its own registry: under app.serve every worker reports itself.
+"""
+import contextvars
+import threading
+import time
+from bisect import bisect_left
+
+# Секунды: от единиц микросекунд (этапы скоринга) до секунды (запрос целиком под нагрузкой)
+LATENCY_BUCKETS = (0.000005, 0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005,
+                   0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+
+# [начало запроса, конец обработчика] - обработчик /predict пишет второе значение,
+# middleware по нему считает время сериализации ответа
+request_timing = contextvars.ContextVar("request_timing", default=None)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names, values, extra=""):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Sharded:
+    """A fixed-size list of numbers per thread; only the owning thread writes to it"""
+
+    def __init__(self, size):
+        self._size = size
+        self._local = threading.local()
+        self._shards = []
+        self._lock = threading.Lock()  # только при первом обращении потока и при сборе
+
+    def _shard(self):
+        try:
+            return self._local.shard
+        except AttributeError:
+            shard = self._local.shard = [0] * self._size
+            with self._lock:
+                self._shards.append(shard)
+            return shard
+
+    def _total(self):
+        with self._lock:
+            shards = list(self._shards)
+        return [sum(column) for column in zip(*shards)] if shards else [0] * self._size
+
+
+class _CounterChild(_Sharded):
+    def __init__(self):
+        super().__init__(1)
+
+    def inc(self, amount=1):
+        self._shard()[0] += amount
+
+    def value(self):
+        return self._total()[0]
+
+
+class _HistogramChild(_Sharded):
+    def __init__(self, buckets):
+        # счетчики по корзинам, +Inf, затем сумма
+        super().__init__(len(buckets) + 2)
+        self.buckets = buckets
+
+    def observe(self, value):
+        shard = self._shard()
+        shard[bisect_left(self.buckets, value)] += 1
+        shard[-1] += value
+
+    def time(self, started):
+        """Observe the time since a perf_counter() reading; returns the current reading"""
+        now = time.perf_counter()
+        self.observe(now - started)
+        return now
+
+
+class _GaugeChild:
+    def __init__(self):
+        self._value = 0
+
+    def set(self, value):
+        self._value = value
+
+    def inc(self, amount=1):
+        self._value += amount
+
+    def dec(self, amount=1):
+        self._value -= amount
+
+    def value(self):
+        return self._value
+
+
+class _Metric:
+    kind = None
+
+    def __init__(self, name, documentation, labelnames=(), registry=None):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children = {}
+        self._bound = {}
+        self._lock = threading.Lock()
+        if not self.labelnames:
+            self._default = self.labels()
+        (REGISTRY if registry is None else registry).register(self)
+
+    def _child(self):
+        raise NotImplementedError
+
+    def labels(self, *values, **kwargs):
+        """Bind a label set once and keep the returned child for the hot path"""
+        key = values or tuple(kwargs[name] for name in self.labelnames)
+        child = self._bound.get(key)
+        if child is None:
+            if len(key) != len(self.labelnames):
+                raise ValueError(f"{self.name} expects labels {self.labelnames}, got {key}")
+            with self._lock:
+                child = self._children.setdefault(tuple(str(v) for v in key), self._child())
+            self._bound[key] = child
+        return child
+
+    def _samples(self):
+        for key, child in list(self._children.items()):
+            yield "", _labels(self.labelnames, key), child.value()
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(f"{self.name}{suffix}{labels} {_format(value)}" for suffix, labels, value in self._samples())
+        return lines
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def _child(self):
+        return _CounterChild()
+
+    def inc(self, amount=1):
+        self._default.inc(amount)
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def __init__(self, name, documentation, labelnames=(), registry=None, function=None):
+        # function: () -> value, или {кортеж значений меток: value} для гейджа с метками
+        self.function = function
+        super().__init__(name, documentation, labelnames, registry)
+
+    def _child(self):
+        return _GaugeChild()
+
+    def set(self, value):
+        self._default.set(value)
+
+    def inc(self, amount=1):
+        self._default.inc(amount)
+
+    def dec(self, amount=1):
+        self._default.dec(amount)
+
+    def _samples(self):
+        if self.function is None:
+            yield from super()._samples()
+        elif self.labelnames:
+            for key, value in self.function().items():
+                yield "", _labels(self.labelnames, key), value
+        else:
+            yield "", "", self.function()
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), registry=None, buckets=LATENCY_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        super().__init__(name, documentation, labelnames, registry)
+
+    def _child(self):
+        return _HistogramChild(self.buckets)
+
+    def observe(self, value):
+        self._default.observe(value)
+
+    def _samples(self):
+        for key, child in list(self._children.items()):
+            counts = child._total()
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                yield "_bucket", _labels(self.labelnames, key, f'le="{le}"'), cumulative
+            yield "_sum", _labels(self.labelnames, key), counts[-1]
+            yield "_count", _labels(self.labelnames, key), cumulative
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+
+    def render(self):
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware: request count/latency by route, in-flight gauge, /predict serialization time"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        started = time.perf_counter()
+        timing = [started, None]
+        token = request_timing.set(timing)
+        status = [500]
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status[0] = message["status"]
+                if timing[1] is not None:
+                    # Конец обработчика -> заголовки ответа ушли: сериализация ответа
+                    STAGE_SERIALIZATION.observe(time.perf_counter() - timing[1])
+            await send(message)
+
+        HTTP_IN_FLIGHT.inc()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            HTTP_IN_FLIGHT.dec()
+            request_timing.reset(token)
+            route = getattr(scope.get("route"), "path", None) or "unmatched"
+            HTTP_REQUESTS.labels(scope["method"], route, status[0]).inc()
+            HTTP_LATENCY.labels(route).observe(time.perf_counter() - started)
+
+
+HTTP_REQUESTS = Counter("credit_http_requests_total", "HTTP requests by route and status",
+                        ("method", "route", "status"))
+HTTP_LATENCY = Histogram("credit_http_request_duration_seconds", "HTTP request latency by route", ("route",))
+HTTP_IN_FLIGHT = Gauge("credit_http_requests_in_flight", "HTTP requests being served")
+
+STAGE_LATENCY = Histogram("credit_predict_stage_seconds",
+                          "Time spent in each /predict stage (inference covers scaling, the linear and "
+                          "the logistic model, which run as one fused dot product)", ("stage",))
+STAGE_VALIDATION = STAGE_LATENCY.labels("validation")
+STAGE_FEATURES = STAGE_LATENCY.labels("features")
+STAGE_INFERENCE = STAGE_LATENCY.labels("inference")
+STAGE_DECISION = STAGE_LATENCY.labels("decision")
+STAGE_SERIALIZATION = STAGE_LATENCY.labels("serialization")
+
+PREDICTIONS = Counter("credit_predictions_total", "Scored clients by model version, risk level and decision",
+                      ("model_version", "risk_level", "decision"))
+
+AUDIT_ENTRIES = Counter("credit_audit_entries_total",
+                        "Audit log entries by outcome: written, dropped or rejected (queue full), failed (I/O)",
+                        ("outcome",))
+
+MICRO_BATCH_SIZE = Histogram("credit_micro_batch_size", "Single-row /predict requests scored together per micro-batch",
+                             buckets=(1, 2, 4, 8, 16, 32, 64, 128, 256))
+MICRO_BATCH_WAIT = Histogram("credit_micro_batch_wait_seconds",
+                             "Time a /predict request waited for its micro-batch to be dispatched")
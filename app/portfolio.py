@@ -0,0 +1,325 @@
+import argparse
+import json
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+PORTFOLIO_DB_FILE = "portfolio.db"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS portfolio (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    client_id TEXT NOT NULL,
+    timestamp TEXT NOT NULL,
+    credit_score REAL,
+    default_probability REAL,
+    risk_level TEXT,
+    decision TEXT,
+    data TEXT NOT NULL,
+    result TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_portfolio_client ON portfolio (client_id, id);
+CREATE INDEX IF NOT EXISTS idx_portfolio_timestamp ON portfolio (timestamp);
+CREATE INDEX IF NOT EXISTS idx_portfolio_risk ON portfolio (risk_level, id);
+CREATE INDEX IF NOT EXISTS idx_portfolio_decision ON portfolio (decision, id);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS stats (
+    bucket_size INTEGER NOT NULL,
+    bucket INTEGER NOT NULL,
+    payload TEXT NOT NULL,
+    PRIMARY KEY (bucket_size, bucket)
+);
+"""
+
+ENTRY_COLUMNS = "id, client_id, timestamp, data, result"
+INSERT_ENTRY = ("INSERT INTO portfolio (client_id, timestamp, credit_score, default_probability,"
+                " risk_level, decision, data, result) VALUES (?, ?, ?, ?, ?, ?, ?, ?)")
+UPSERT_STATS = ("INSERT INTO stats (bucket_size, bucket, payload) VALUES (?, ?, ?)"
+                " ON CONFLICT (bucket_size, bucket) DO UPDATE SET payload = excluded.payload")
+
+SCORE_BINS = ["300-400", "400-500", "500-600", "600-700", "700-800", "800+"]
+PROB_BINS = ["0-20", "20-40", "40-60", "60-80", "80-100"]
+
+# Размер корзины (сек) -> сколько храним; 0 - итоги за все время
+TOTAL = 0
+MINUTE = 60
+HOUR = 3600
+BUCKET_RETENTION = {MINUTE: 2 * HOUR, HOUR: 31 * 24 * HOUR}
+WINDOWS = {"hour": (MINUTE, HOUR), "day": (HOUR, 24 * HOUR), "30d": (HOUR, 30 * 24 * HOUR)}
+
+
+def _number(value):
+    return value if isinstance(value, (int, float)) and not isinstance(value, bool) else None
+
+
+def _epoch(timestamp):
+    try:
+        return datetime.fromisoformat(timestamp).timestamp()
+    except (TypeError, ValueError):
+        return time.time()
+
+
+def _stats_keys(timestamp):
+    """Aggregates an entry contributes to: the all-time total and one bucket per bucket size"""
+    ts = _epoch(timestamp)
+    return [(TOTAL, 0)] + [(size, int(ts // size)) for size in BUCKET_RETENTION]
+
+
+class PortfolioStats:
+    """Counters, sums and histograms of scored entries, updated one entry at a time"""
+
+    def __init__(self, payload=None):
+        payload = payload or {}
+        self.count = payload.get("count", 0)
+        self.score_sum = payload.get("score_sum", 0.0)
+        self.prob_sum = payload.get("prob_sum", 0.0)
+        self.score_hist = payload.get("score_hist", [0] * len(SCORE_BINS))
+        self.prob_hist = payload.get("prob_hist", [0] * len(PROB_BINS))
+        self.risks = payload.get("risks", {"Low": 0, "Medium": 0, "High": 0})
+        self.decisions = payload.get("decisions", {"APPROVE": 0, "REVIEW": 0, "REJECT": 0})
+
+    def add(self, score, prob, risk, decision):
+        self.count += 1
+        if score is not None:
+            self.score_hist[min(5, max(0, int((score - 300)//100)))] += 1
+            self.score_sum += score
+        if prob is not None:
+            self.prob_hist[min(4, max(0, int(prob//20)))] += 1
+            self.prob_sum += prob
+        if risk in self.risks: self.risks[risk] += 1
+        if decision in self.decisions: self.decisions[decision] += 1
+
+    def merge(self, other):
+        self.count += other.count
+        self.score_sum += other.score_sum
+        self.prob_sum += other.prob_sum
+        self.score_hist = [a + b for a, b in zip(self.score_hist, other.score_hist)]
+        self.prob_hist = [a + b for a, b in zip(self.prob_hist, other.prob_hist)]
+        for k, v in other.risks.items(): self.risks[k] += v
+        for k, v in other.decisions.items(): self.decisions[k] += v
+        return self
+
+    def dumps(self):
+        return json.dumps({
+            "count": self.count, "score_sum": self.score_sum, "prob_sum": self.prob_sum,
+            "score_hist": self.score_hist, "prob_hist": self.prob_hist,
+            "risks": self.risks, "decisions": self.decisions,
+        })
+
+    def summary(self):
+        n = self.count
+        if not n:
+            return {"count": 0, "msg": "No portfolio data"}
+        return {
+            "count": n,
+            "avg_score": round(self.score_sum/n, 2),
+            "avg_default_probability": round(self.prob_sum/n, 2),
+            "risk_distribution": {k: round(v/n*100, 2) for k, v in self.risks.items()},
+            "decision_distribution": {k: round(v/n*100, 2) for k, v in self.decisions.items()},
+            "score_histogram": {"bins": SCORE_BINS, "counts": list(self.score_hist)},
+            "default_probability_histogram": {"bins": PROB_BINS, "counts": list(self.prob_hist)}
+        }
+
+
+class PortfolioStore:
+    """Append-only portfolio history in SQLite (WAL), indexed by client_id and timestamp"""
+
+    def __init__(self, path=PORTFOLIO_DB_FILE):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = self._connect()
+        with self._lock:
+            self._conn.executescript(SCHEMA)
+        if self.statistics()["count"] != self.count():
+            # База без агрегатов (или они разошлись) - пересчитываем один раз
+            self.recompute_stats()
+
+    def _connect(self):
+        # Несколько воркеров пишут в одну базу: ждем блокировку записи, а не падаем
+        conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    @contextmanager
+    def _write(self):
+        """Write transaction holding the SQLite write lock, so it is serialized across worker processes"""
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield self._conn
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    @staticmethod
+    def _row(entry):
+        result = entry.get("result") or {}
+        return (
+            str(entry["client_id"]),
+            entry.get("timestamp") or datetime.now().isoformat(),
+            _number(result.get("credit_score")),
+            _number(result.get("default_probability")),
+            result.get("risk_level"),
+            result.get("decision"),
+            json.dumps(entry.get("data") or {}),
+            json.dumps(result),
+        )
+
+    @staticmethod
+    def _entry(row):
+        entry_id, client_id, timestamp, data, result = row
+        return {
+            "id": entry_id,
+            "client_id": client_id,
+            "timestamp": timestamp,
+            "data": json.loads(data),
+            "result": json.loads(result),
+        }
+
+    def _insert(self, conn, rows):
+        """Insert entries and fold them into the persisted aggregates; runs inside _write()"""
+        updated, new_buckets = {}, False
+        for row in rows:
+            for key in _stats_keys(row[1]):
+                if key not in updated:
+                    found = conn.execute("SELECT payload FROM stats WHERE bucket_size = ? AND bucket = ?",
+                                         key).fetchone()
+                    updated[key] = PortfolioStats(json.loads(found[0]) if found else None)
+                    new_buckets = new_buckets or found is None
+                updated[key].add(*row[2:6])
+
+        for row in rows:
+            cur = conn.execute(INSERT_ENTRY, row)
+        conn.executemany(UPSERT_STATS, [(size, bucket, acc.dumps()) for (size, bucket), acc in updated.items()])
+        if new_buckets:
+            self._prune_buckets(conn)
+        return cur.lastrowid
+
+    @staticmethod
+    def _prune_buckets(conn):
+        now = time.time()
+        for size, retention in BUCKET_RETENTION.items():
+            conn.execute("DELETE FROM stats WHERE bucket_size = ? AND bucket < ?",
+                         (size, int((now - retention) // size)))
+
+    def append(self, entry):
+        """Record one scored client; returns the new entry id"""
+        row = self._row(entry)
+        with self._write() as conn:
+            return self._insert(conn, [row])
+
+    def append_many(self, entries):
+        rows = [self._row(e) for e in entries]
+        if rows:
+            with self._write() as conn:
+                self._insert(conn, rows)
+        return len(rows)
+
+    def statistics(self, window=None):
+        """Portfolio summary from the maintained aggregates; window is None, 'hour', 'day' or '30d'"""
+        if window is None:
+            sql, params = "SELECT payload FROM stats WHERE bucket_size = ?", (TOTAL,)
+        else:
+            size, span = WINDOWS[window]
+            sql = "SELECT payload FROM stats WHERE bucket_size = ? AND bucket >= ?"
+            params = (size, int((time.time() - span) // size) + 1)
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        acc = PortfolioStats()
+        for (payload,) in rows:
+            acc.merge(PortfolioStats(json.loads(payload)))
+        return acc.summary()
+
+    def recompute_stats(self):
+        """Rebuild all aggregates from the stored entries"""
+        with self._write() as conn:
+            stats = {}
+            rows = conn.execute(
+                "SELECT timestamp, credit_score, default_probability, risk_level, decision FROM portfolio")
+            for timestamp, score, prob, risk, decision in rows:
+                for key in _stats_keys(timestamp):
+                    stats.setdefault(key, PortfolioStats()).add(score, prob, risk, decision)
+            conn.execute("DELETE FROM stats")
+            conn.executemany(UPSERT_STATS, [(size, bucket, acc.dumps()) for (size, bucket), acc in stats.items()])
+            self._prune_buckets(conn)
+        return stats.get((TOTAL, 0), PortfolioStats()).summary()
+
+    def count(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM portfolio").fetchone()[0]
+
+    def page(self, limit=100, cursor=None, risk_level=None, decision=None,
+             min_score=None, max_score=None, since=None, until=None):
+        """One page of entries after `cursor` (an entry id) matching the filters -> (entries, next_cursor)"""
+        clauses, params = [], []
+        for clause, value in (("id > ?", cursor), ("risk_level = ?", risk_level), ("decision = ?", decision),
+                              ("credit_score >= ?", min_score), ("credit_score <= ?", max_score),
+                              ("timestamp >= ?", since), ("timestamp < ?", until)):
+            if value is not None:
+                clauses.append(clause)
+                params.append(value)
+        sql = f"SELECT {ENTRY_COLUMNS} FROM portfolio"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        with self._lock:
+            rows = self._conn.execute(sql + " ORDER BY id LIMIT ?", params + [limit + 1]).fetchall()
+        next_cursor = rows[limit - 1][0] if len(rows) > limit else None
+        return [self._entry(r) for r in rows[:limit]], next_cursor
+
+    def iter_pages(self, cursor=None, limit=None, chunk_size=500, **filters):
+        """Lazily yield lists of matching entries, one page at a time (constant memory), at most limit in total"""
+        while limit is None or limit > 0:
+            entries, cursor = self.page(chunk_size if limit is None else min(chunk_size, limit), cursor, **filters)
+            if entries:
+                yield entries
+            if cursor is None:
+                return
+            if limit is not None:
+                limit -= len(entries)
+
+    def client_history(self, client_id):
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT {ENTRY_COLUMNS} FROM portfolio WHERE client_id = ? ORDER BY id",
+                (str(client_id),)).fetchall()
+        return [self._entry(r) for r in rows]
+
+    def import_json(self, path):
+        """One-time import of a legacy portfolio_history.json; returns the number of imported entries"""
+        key = "json_import:" + os.path.abspath(path)
+        marker = "SELECT 1 FROM meta WHERE key = ?"
+        with self._lock:
+            if self._conn.execute(marker, (key,)).fetchone():
+                return 0
+        with open(path) as f:
+            rows = [self._row(e) for e in json.load(f)]
+        with self._write() as conn:
+            # Повторная проверка под блокировкой: другой воркер мог успеть импортировать
+            if conn.execute(marker, (key,)).fetchone():
+                return 0
+            if rows:
+                self._insert(conn, rows)
+            conn.execute("INSERT INTO meta (key, value) VALUES (?, ?)", (key, datetime.now().isoformat()))
+        return len(rows)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Import portfolio_history.json into the portfolio store")
+    parser.add_argument("history", nargs="?", default="portfolio_history.json")
+    parser.add_argument("--db", default=PORTFOLIO_DB_FILE)
+    args = parser.parse_args()
+
+    store = PortfolioStore(args.db)
+    n = store.import_json(args.history)
+    print(f"Imported {n} entries into {args.db} ({store.count()} total)")
@@ -1,3 +1,4 @@
+import logging
 import os
 
 import joblib
@@ -6,14 +7,20 @@ import numpy as np
 import json
 from pathlib import Path
 
+from app.decision import DecisionPolicy
+from app.features import FeatureAssembler
+from app.logging_config import should_dump_features
+
+logger = logging.getLogger(__name__)
+
 class CreditScoringPredictor:
     """Credit scoring prediction class"""
 
-    def __init__(self, models_dir='models'):
+    def __init__(self, models_dir='models', policy=None):
         """Load all models"""
         self.models_dir = Path(models_dir)
 
-        print("Loading models...")
+        logger.info("Loading models...")
 
         # Load models
         self.logistic_model = joblib.load(self.models_dir / 'logistic_model.joblib')
@@ -27,54 +34,66 @@ class CreditScoringPredictor:
         with open(os.path.join(models_dir, 'feature_means.json')) as f:
             self.feature_means = json.load(f)
 
-        self.features = self.feature_means['features']
+        self.assembler = FeatureAssembler(self.feature_means)
+        self.features = self.assembler.features
+        # Те же полосы риска, что и в API (app.config), если не передана своя политика
+        self.policy = policy or DecisionPolicy.from_config()
 
-        print(f"✅ Models loaded successfully!")
-        print(f"   Features: {len(self.features)}")
+        logger.info(f"✅ Models loaded successfully! Features: {len(self.features)}")
 
     def predict_full(self, client_data: dict) -> dict:
         """Complete prediction"""
-        # Convert to DataFrame
-        df = pd.DataFrame([client_data])[self.features]
-        print("ПОДАЕМ В МОДЕЛЬ:")
-        print(df.T)  # Печатает все 84 признака и значения
-
-        # Ensure all features present
-        for feature in self.features:
-            if feature not in df.columns:
-                df[feature] = 0
-
-        # Select features in correct order
-        df = df[self.features]
-
-        # Scale
-        X_scaled = self.scaler.transform(df)
-
-        # Predict default
-        default_proba = self.logistic_model.predict_proba(X_scaled)[0][1]
-        default_class = self.logistic_model.predict(X_scaled)[0]
-
-        # Predict score
-        credit_score = self.linear_model.predict(X_scaled)[0]
-
-        # Risk level
-        if default_proba < 0.3:
-            risk_level = "Low"
-            decision = "APPROVE"
-        elif default_proba < 0.5:
-            risk_level = "Medium"
-            decision = "REVIEW"
-        else:
-            risk_level = "High"
-            decision = "REJECT"
+        # Missing features are filled from feature_means, unknown keys are rejected
+        x = self.assembler.vector(client_data)
+        if should_dump_features(logger):
+            logger.debug("ПОДАЕМ В МОДЕЛЬ", extra={"fields": {"features": dict(zip(self.features, x.tolist()))}})
 
+        result = self.predict_matrix(x.reshape(1, -1))
         return {
-            'default_probability': round(float(default_proba) * 100, 2),
-            'default_class': int(default_class),
+            'default_probability': float(result['default_probability'][0]),
+            'default_class': int(result['default_class'][0]),
+            'risk_level': str(result['risk_level'][0]),
+            'decision': str(result['decision'][0]),
+            'credit_score': float(result['credit_score'][0]),
+            'score_range': '300-800'
+        }
+
+    def predict_many(self, records, ignore_unknown=False) -> dict:
+        """Score many clients in one pass; returns columnar results (name -> array).
+
+        records may be a list of dicts, a columnar mapping (dict of arrays, DataFrame) or an
+        (N, n_features) array in self.features order. Missing ratios are derived from the raw
+        totals, other missing features and NaN are filled from feature_means; unknown names raise
+        UnknownFeatureError unless ignore_unknown is set (columnar input only).
+        """
+        if isinstance(records, np.ndarray):
+            X = np.array(records, dtype=np.float64)
+            if X.ndim != 2 or X.shape[1] != len(self.features):
+                raise ValueError(f"Expected an (N, {len(self.features)}) array, got {X.shape}")
+            self.assembler.complete(X)
+        elif hasattr(records, "keys"):
+            X = self.assembler.column_matrix(records, ignore_unknown)
+        else:
+            X, errors = self.assembler.matrix(records)
+            for i, error in enumerate(errors):
+                if error is not None:
+                    raise ValueError(f"Record {i}: {error}")
+        return self.predict_matrix(X)
+
+    def predict_matrix(self, X) -> dict:
+        """Score an (N, n_features) raw matrix in one pass; returns columnar results"""
+        X_scaled = self.scaler.transform(pd.DataFrame(X, columns=self.features))
+        default_proba = self.logistic_model.predict_proba(X_scaled)[:, 1]
+        credit_score = self.linear_model.predict(X_scaled)
+
+        # Класс выводим из вероятности (predict == proba > 0.5), полосы риска - сразу для всего массива
+        risk_level, decision = self.policy.decide_many(default_proba)
+        return {
+            'default_probability': np.round(default_proba * 100, 2),
+            'default_class': (default_proba > 0.5).astype(np.int64),
             'risk_level': risk_level,
             'decision': decision,
-            'credit_score': round(float(credit_score), 2),
-            'score_range': '300-800'
+            'credit_score': np.round(credit_score, 2),
         }
 
     def get_model_info(self) -> dict:
@@ -0,0 +1,265 @@
+import argparse
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import re
+
+import numpy as np
+
+from app.features import FeatureAssembler
+from app.scoring import ScoringEngine
+
+logger = logging.getLogger(__name__)
+
+BUNDLE_FILES = ("scaler.joblib", "linear_regression.joblib", "logistic_model.joblib",
+                "feature_means.json", "model_metadata.json")
+
+# Компактный формат: JSON-заголовок + все массивы подряд в одном файле float64 (little-endian).
+# Читается одним np.memmap, без joblib/sklearn; собирается командой `python -m app.registry`.
+COMPACT_HEADER = "model.json"
+COMPACT_DATA = "model.f64"
+COMPACT_FORMAT = 1
+COMPACT_ARRAYS = ScoringEngine.ARRAYS + ("defaults",)
+
+
+def _digest(path):
+    with open(path, "rb") as f:
+        return hashlib.blake2b(f.read(), digest_size=16).hexdigest()
+
+
+def _compact_is_current(path):
+    """The compact export exists and was built from the joblib artifacts that sit next to it"""
+    try:
+        with open(os.path.join(path, COMPACT_HEADER)) as f:
+            sources = json.load(f).get("sources", {})
+    except (OSError, ValueError):
+        return False
+    if not os.path.exists(os.path.join(path, COMPACT_DATA)):
+        return False
+    # Без исходников (выкладка только компактного формата) сверять не с чем
+    return all(not os.path.exists(os.path.join(path, name)) or sources.get(name) == _digest(os.path.join(path, name))
+               for name in BUNDLE_FILES)
+
+
+def _artifacts(path):
+    """Files the bundle in `path` is served from: the compact export if it is current, else the joblib set"""
+    if _compact_is_current(path):
+        return (COMPACT_HEADER, COMPACT_DATA)
+    if all(os.path.exists(os.path.join(path, name)) for name in BUNDLE_FILES):
+        return BUNDLE_FILES
+    return None
+
+
+class ModelBundle:
+    """One validated model version: scoring engine, feature assembler and metadata"""
+
+    def __init__(self, version, engine, assembler, metadata, path=None):
+        self.version = version
+        self.engine = engine
+        self.assembler = assembler
+        self.metadata = metadata
+        self.path = path
+        # Ключ для кэша предсказаний: имя версии может совпасть, веса - нет
+        self.cache_version = f"{version}+{engine.fingerprint()}"
+
+    @classmethod
+    def open(cls, path, version=None):
+        """Load whatever `path` holds, preferring the compact export over the joblib artifacts"""
+        files = _artifacts(path)
+        if files is None:
+            raise FileNotFoundError(f"No model artifacts in {path}")
+        if files == BUNDLE_FILES:
+            logger.warning(f"No current compact export in {path}, loading joblib artifacts "
+                           f"(run `python -m app.registry` to speed up startup)")
+            return cls.load(path, version)
+        return cls.load_compact(path, version)
+
+    @classmethod
+    def load(cls, path, version=None):
+        """Load joblib artifacts from `path` and build a parity-checked engine"""
+        import joblib  # тянет sklearn; на пути через компактный формат не импортируется
+
+        with open(os.path.join(path, "feature_means.json")) as f:
+            feature_means = json.load(f)
+        with open(os.path.join(path, "model_metadata.json")) as f:
+            metadata = json.load(f)
+        scaler = joblib.load(os.path.join(path, "scaler.joblib"))
+        linear_model = joblib.load(os.path.join(path, "linear_regression.joblib"))
+        logistic_model = joblib.load(os.path.join(path, "logistic_model.joblib"))
+
+        # Скейлер свернут в веса обеих моделей; паритет с sklearn проверяется здесь же
+        engine = ScoringEngine.from_sklearn(scaler, linear_model, logistic_model)
+        assembler = FeatureAssembler(feature_means)
+        if hasattr(scaler, "feature_names_in_") and list(scaler.feature_names_in_) != assembler.features:
+            raise RuntimeError("feature_means.json feature order does not match the trained scaler")
+        if version is None:
+            version = str(metadata.get("version", metadata["created_at"]))
+        return cls(version, engine, assembler, metadata, path)
+
+    def save_compact(self, path):
+        """Write the compact format into `path`: one raw float64 file plus a JSON header"""
+        arrays = {name: getattr(self.engine, name) for name in ScoringEngine.ARRAYS}
+        arrays["defaults"] = self.assembler.defaults
+        layout, offset = {}, 0
+        for name in COMPACT_ARRAYS:
+            shape = list(np.shape(arrays[name]))
+            layout[name] = {"offset": offset, "shape": shape}
+            offset += int(np.prod(shape))
+        header = {
+            "format": COMPACT_FORMAT,
+            "version": self.version,
+            "features": self.assembler.features,
+            "metadata": self.metadata,
+            "arrays": layout,
+            "sources": {name: _digest(os.path.join(path, name)) for name in BUNDLE_FILES
+                        if os.path.exists(os.path.join(path, name))},
+        }
+
+        os.makedirs(path, exist_ok=True)
+        data_path, header_path = os.path.join(path, COMPACT_DATA), os.path.join(path, COMPACT_HEADER)
+        with open(data_path + ".tmp", "wb") as f:
+            for name in COMPACT_ARRAYS:
+                f.write(np.ascontiguousarray(arrays[name], dtype="<f8").tobytes())
+        with open(header_path + ".tmp", "w") as f:
+            json.dump(header, f, ensure_ascii=False)
+        # Реестр может опрашивать каталог прямо сейчас: подменяем файлы атомарно
+        os.replace(data_path + ".tmp", data_path)
+        os.replace(header_path + ".tmp", header_path)
+        return offset * 8
+
+    @classmethod
+    def load_compact(cls, path, version=None):
+        """Map the compact format read-only; every array is a view into the same pages"""
+        with open(os.path.join(path, COMPACT_HEADER)) as f:
+            header = json.load(f)
+        if header.get("format") != COMPACT_FORMAT:
+            raise ValueError(f"Unsupported compact model format {header.get('format')} in {path}")
+        data = np.memmap(os.path.join(path, COMPACT_DATA), dtype="<f8", mode="r")
+        expected = sum(int(np.prod(a["shape"])) for a in header["arrays"].values())
+        if data.size != expected:
+            raise ValueError(f"{COMPACT_DATA} in {path} holds {data.size} values, header expects {expected}")
+        arrays = {}
+        for name, a in header["arrays"].items():
+            size = int(np.prod(a["shape"]))
+            arrays[name] = data[a["offset"]:a["offset"] + size].reshape(a["shape"])
+
+        defaults = arrays.pop("defaults")
+        assembler = FeatureAssembler({"features": header["features"]}, defaults)
+        return cls(version or header["version"], ScoringEngine(**arrays), assembler, header["metadata"], path)
+
+    def validate(self):
+        """Sanity checks against model_metadata.json; raises ValueError if the bundle must not be served"""
+        n = self.metadata.get("n_features", len(self.assembler.features))
+        if not (n == self.engine.n_features == len(self.assembler.features)):
+            raise ValueError(f"Feature count mismatch: metadata {n}, engine {self.engine.n_features}, "
+                             f"feature_means {len(self.assembler.features)}")
+        if "features" in self.metadata and self.metadata["features"] != self.assembler.features:
+            raise ValueError("model_metadata.json and feature_means.json disagree on the feature order")
+        scores, probs = self.engine.score_many(np.asarray(self.assembler.defaults).reshape(1, -1))
+        if not (np.isfinite(scores).all() and np.isfinite(probs).all() and 0 <= probs[0] <= 1):
+            raise ValueError(f"Non-finite or out-of-range output on the mean client: {scores[0]}, {probs[0]}")
+        return self
+
+
+def _natural_key(name):
+    return [int(part) if part.isdigit() else part for part in re.split(r"(\d+)", name)]
+
+
+class ModelRegistry:
+    """Serves the newest valid bundle from models/<version>/ and swaps in new ones atomically.
+
+    Without versioned subdirectories the flat models/ layout is served as a single version.
+    Readers take `registry.current` once per request, so in-flight requests finish on the
+    bundle they started with while new requests see the new one.
+    """
+
+    def __init__(self, root="models"):
+        self.root = root
+        self.current = None
+        self._loaded = None
+        self._failed = {}
+
+    def versions(self):
+        if not os.path.isdir(self.root):
+            return []
+        names = [name for name in os.listdir(self.root)
+                 if not name.startswith(".") and os.path.isdir(os.path.join(self.root, name))
+                 and _artifacts(os.path.join(self.root, name))]
+        return sorted(names, key=_natural_key)
+
+    def _latest(self):
+        versions = self.versions()
+        if versions:
+            return versions[-1], os.path.join(self.root, versions[-1])
+        return None, self.root
+
+    def _stamp(self, path):
+        files = _artifacts(path) or ()
+        return files, max((os.path.getmtime(os.path.join(path, f)) for f in files), default=None)
+
+    def load(self):
+        """Load the newest bundle that validates, synchronously (startup); broken newer ones are skipped"""
+        versions = self.versions()
+        candidates = [(version, os.path.join(self.root, version)) for version in reversed(versions)] \
+            or [(None, self.root)]
+        for version, path in candidates:
+            stamp = self._stamp(path)
+            try:
+                bundle = ModelBundle.open(path, version).validate()
+            except Exception as e:
+                if len(candidates) == 1:
+                    raise
+                # Запоминаем, чтобы check_for_update не проверял те же файлы снова
+                self._failed[path] = stamp
+                logger.error(f"Model version {version} rejected: {e}")
+                continue
+            self.current = bundle
+            self._loaded = (path, stamp)
+            logger.info(f"Serving model version {self.current.version}")
+            return self.current
+        raise RuntimeError(f"None of the model versions in {self.root} is valid: {', '.join(versions)}")
+
+    def check_for_update(self):
+        """Load the newest bundle if it differs from the current one; returns True if it was swapped in"""
+        version, path = self._latest()
+        stamp = self._stamp(path)
+        if (path, stamp) == self._loaded or self._failed.get(path) == stamp:
+            return False  # ничего нового, либо эти же файлы уже не прошли проверку
+        try:
+            bundle = ModelBundle.open(path, version).validate()
+        except Exception as e:
+            self._failed[path] = stamp
+            logger.error(f"Model version {version or path} rejected: {e}")
+            return False
+        previous, self.current = self.current, bundle
+        self._loaded = (path, stamp)
+        logger.info(f"Swapped model version {previous.version if previous else None} -> {bundle.version}")
+        return True
+
+    async def watch(self, interval):
+        """Poll for new versions; loading and validation run off the event loop"""
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await asyncio.to_thread(self.check_for_update)
+            except Exception as e:
+                logger.error(f"Model registry check failed: {e}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export joblib model artifacts to the compact serving format")
+    parser.add_argument("versions", nargs="*", help="versions under --models-dir (default: all, or the flat layout)")
+    parser.add_argument("--models-dir", default="models")
+    args = parser.parse_args()
+
+    registry = ModelRegistry(args.models_dir)
+    targets = [(v, os.path.join(args.models_dir, v)) for v in args.versions or registry.versions()]
+    for version, path in targets or [(None, args.models_dir)]:
+        if not all(os.path.exists(os.path.join(path, name)) for name in BUNDLE_FILES):
+            print(f"Skipping {path}: no joblib artifacts")
+            continue
+        bundle = ModelBundle.load(path, version).validate()
+        size = bundle.save_compact(path)
+        print(f"Exported {path} -> {COMPACT_DATA} ({size} bytes), fingerprint {bundle.engine.fingerprint()}")
@@ -0,0 +1,136 @@
+import hashlib
+import math
+import threading
+
+import numpy as np
+
+
+def _logistic_link_scale(logistic_model):
+    """Factor sklearn applies to the decision function before the sigmoid (1 for ovr, 2 for multinomial)"""
+    # Бинарная multinomial-регрессия считает softmax([-z, z]) == sigmoid(2z). Так же sklearn 1.3
+    # трактует модели, сохраненные в sklearn>=1.5 с multi_class='deprecated'.
+    probe = np.ravel(logistic_model.coef_).reshape(1, -1)
+    z = float(logistic_model.decision_function(probe)[0])
+    p = float(logistic_model.predict_proba(probe)[0, 1])
+    if abs(p - 1.0 / (1.0 + math.exp(-2 * z))) < abs(p - 1.0 / (1.0 + math.exp(-z))):
+        return 2.0
+    return 1.0
+
+
+def top_k_indices(values, k):
+    """(N, F) values -> (N, k) column indices of the largest |values| per row, largest first"""
+    magnitude = np.abs(values)
+    k = min(k, values.shape[1])
+    # argpartition - O(F) на строку; сортируем уже только k отобранных
+    top = np.argpartition(-magnitude, k - 1, axis=1)[:, :k]
+    order = np.argsort(-np.take_along_axis(magnitude, top, axis=1), axis=1, kind="stable")
+    return np.take_along_axis(top, order, axis=1)
+
+
+class ScoringEngine:
+    """Closed-form scorer: scaler folded into the linear and logistic weights"""
+
+    ARRAYS = ("mean", "scale", "coef", "intercept", "weights", "bias")
+
+    def __init__(self, mean, scale, coef, intercept, weights=None, bias=None):
+        # coef/intercept are the raw model parameters over the *scaled* vector:
+        # row 0 - linear regression (credit score), row 1 - logistic (default log-odds)
+        self.mean = np.ascontiguousarray(mean, dtype=np.float64)
+        self.scale = np.ascontiguousarray(scale, dtype=np.float64)
+        self.coef = np.ascontiguousarray(coef, dtype=np.float64)
+        self.intercept = np.ascontiguousarray(intercept, dtype=np.float64)
+
+        # (x - mean) / scale @ coef + b  ==  x @ (coef / scale) + (b - mean / scale @ coef)
+        if weights is None:
+            weights = (self.coef / self.scale).T
+            bias = self.intercept - (self.coef * (self.mean / self.scale)).sum(axis=1)
+        self.weights = np.ascontiguousarray(weights, dtype=np.float64)
+        self.bias = np.ascontiguousarray(bias, dtype=np.float64)
+        self.n_features = self.weights.shape[0]
+
+        self._local = threading.local()
+
+    @classmethod
+    def from_sklearn(cls, scaler, linear_model, logistic_model, verify=True):
+        """Build the engine from fitted StandardScaler / LinearRegression / LogisticRegression"""
+        n = scaler.n_features_in_
+        mean = scaler.mean_ if scaler.with_mean else np.zeros(n)
+        scale = scaler.scale_ if scaler.with_std else np.ones(n)
+        if list(logistic_model.classes_) != [0, 1]:
+            raise ValueError(f"Expected binary logistic model with classes [0, 1], got {logistic_model.classes_}")
+
+        link = _logistic_link_scale(logistic_model)
+        coef = np.vstack([np.ravel(linear_model.coef_), np.ravel(logistic_model.coef_) * link])
+        intercept = np.array([float(np.ravel(linear_model.intercept_)[0]),
+                              float(np.ravel(logistic_model.intercept_)[0]) * link])
+        engine = cls(mean, scale, coef, intercept)
+        if verify:
+            engine.check_parity(scaler, linear_model, logistic_model)
+        return engine
+
+    def fingerprint(self):
+        """Short content hash of the folded weights; changes whenever the artifacts change the scores"""
+        h = hashlib.blake2b(digest_size=8)
+        for array in (self.weights, self.bias):
+            h.update(np.ascontiguousarray(array).tobytes())
+        return h.hexdigest()
+
+    def _buffer(self):
+        buf = getattr(self._local, "buf", None)
+        if buf is None:
+            buf = self._local.buf = np.empty(2, dtype=np.float64)
+        return buf
+
+    def score(self, x):
+        """Score one raw (unscaled) feature vector -> (credit_score, default_probability)"""
+        buf = self._buffer()
+        np.dot(x, self.weights, out=buf)
+        credit_score = float(buf[0] + self.bias[0])
+        z = float(buf[1] + self.bias[1])
+        if z >= 0:
+            default_prob = 1.0 / (1.0 + math.exp(-z))
+        else:
+            e = math.exp(z)
+            default_prob = e / (1.0 + e)
+        return credit_score, default_prob
+
+    def score_many(self, matrix):
+        """Score an (N, n_features) raw matrix -> (scores, default_probabilities)"""
+        out = np.asarray(matrix, dtype=np.float64) @ self.weights
+        out += self.bias
+        with np.errstate(over="ignore"):
+            probs = 1.0 / (1.0 + np.exp(-out[:, 1]))
+        return out[:, 0], probs
+
+    def explain_many(self, matrix):
+        """Score an (N, n_features) raw matrix and split both outputs into per-feature terms.
+
+        -> (scores, default_probabilities, contributions) where contributions[0] / [1] are the
+        (N, n_features) terms coef * x_scaled of the credit score / default log-odds; each row
+        sums to the model output minus the intercept, so the scores come from the same product.
+        """
+        centered = np.asarray(matrix, dtype=np.float64) - self.mean
+        contributions = centered[None, :, :] * self.weights.T[:, None, :]
+        out = contributions.sum(axis=2)
+        out += self.intercept[:, None]
+        with np.errstate(over="ignore"):
+            probs = 1.0 / (1.0 + np.exp(-out[1]))
+        return out[0], probs, contributions
+
+    def check_parity(self, scaler, linear_model, logistic_model, n_samples=256, seed=0):
+        """Compare against the sklearn path on synthetic rows around the training mean"""
+        rng = np.random.default_rng(seed)
+        sample = self.mean + rng.standard_normal((n_samples, self.n_features)) * self.scale * 2
+        scaled = scaler.transform(sample)
+        expected_scores = linear_model.predict(scaled)
+        expected_probs = logistic_model.predict_proba(scaled)[:, 1]
+
+        scores, probs = self.score_many(sample)
+        single = np.array([self.score(row) for row in sample])
+        for name, got, want in (("credit score", scores, expected_scores),
+                                ("default probability", probs, expected_probs),
+                                ("credit score (single)", single[:, 0], expected_scores),
+                                ("default probability (single)", single[:, 1], expected_probs)):
+            if not np.allclose(got, want, rtol=1e-7, atol=1e-6):
+                diff = float(np.max(np.abs(got - want)))
+                raise RuntimeError(f"Scoring engine parity check failed for {name}: max abs diff {diff}")
@@ -0,0 +1,184 @@
+"""Production launcher: N uvicorn workers pinned to cores, sharing one memory-mapped model.
+
+    python -m app.serve --workers 4 --port 8000
+
+The master exports the newest valid model version (see ModelRegistry.load: broken newer
+versions are skipped) once into the compact flat format; workers map it read-only, so
+the pages are shared through the page cache and no worker unpickles the sklearn
+artifacts. SIGHUP re-exports the model and replaces the workers one by one (a new
+worker must be serving before the old one is stopped; if one fails, the workers
+already replaced are rolled back to the previous model; if the export itself fails,
+the workers keep serving the current one);
+SIGTERM/SIGINT stop everything gracefully.
+"""
+import argparse
+import logging
+import multiprocessing
+import os
+import shutil
+import signal
+import socket
+import time
+
+SHARED_MODEL_ENV = "CREDIT_SCORE_SHARED_MODEL"
+SHARED_MODEL_ROOT = "models/.shared"
+WORKER_READY_TIMEOUT = 60
+WORKER_STOP_TIMEOUT = 30
+
+logger = logging.getLogger("app.serve")
+spawn = multiprocessing.get_context("spawn")
+
+
+def _export(path):
+    # Свежий процесс: sklearn/joblib не остаются в памяти мастера
+    from app import config
+    from app.registry import ModelRegistry
+    ModelRegistry(config.MODELS_DIR).load().save_compact(path)
+
+
+def export_shared_model(root=SHARED_MODEL_ROOT):
+    """Export the current artifacts into a new versioned directory under root and return its path"""
+    path = os.path.abspath(os.path.join(root, f"{int(time.time() * 1000)}-{os.getpid()}"))
+    tmp = path + ".tmp"
+    proc = spawn.Process(target=_export, args=(tmp,))
+    proc.start()
+    proc.join()
+    if proc.exitcode != 0:
+        shutil.rmtree(tmp, ignore_errors=True)
+        raise RuntimeError("Model export failed, see worker log above")
+    os.rename(tmp, path)
+    return path
+
+
+def _run_worker(sock, cpu, model_dir, ready, log_level):
+    import uvicorn
+
+    if cpu is not None:
+        os.sched_setaffinity(0, {cpu})
+    os.environ[SHARED_MODEL_ENV] = model_dir
+
+    class Server(uvicorn.Server):
+        async def startup(self, sockets=None):
+            await super().startup(sockets=sockets)
+            ready.set()
+
+    config = uvicorn.Config("app.main:app", log_level=log_level)
+    Server(config).run(sockets=[sock])
+
+
+class Supervisor:
+    def __init__(self, sock, workers, log_level="info", model_root=SHARED_MODEL_ROOT):
+        self.sock = sock
+        self.log_level = log_level
+        self.model_root = model_root
+        cpus = sorted(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else []
+        self.cpus = [cpus[i % len(cpus)] if cpus else None for i in range(workers)]
+        self.workers = [None] * workers
+        self.model_dir = None
+        self._retired = []  # каталоги, которые еще читают воркеры; удаляются при остановке
+        self._reload = False
+        self._stop = False
+
+    def _spawn(self, slot, model_dir=None):
+        ready = spawn.Event()
+        proc = spawn.Process(target=_run_worker, name=f"worker-{slot}",
+                             args=(self.sock, self.cpus[slot], model_dir or self.model_dir, ready, self.log_level))
+        proc.start()
+        logger.info(f"Started worker {slot} (pid {proc.pid}, cpu {self.cpus[slot]})")
+        return proc, ready
+
+    @staticmethod
+    def _stop_worker(proc):
+        proc.terminate()  # uvicorn: SIGTERM -> дожидается текущих запросов
+        proc.join(WORKER_STOP_TIMEOUT)
+        if proc.is_alive():
+            # Зависший воркер не должен держать мастер (и обработку SIGHUP/SIGTERM)
+            logger.warning(f"Worker pid {proc.pid} did not stop in {WORKER_STOP_TIMEOUT}s, killing it")
+            proc.kill()
+            proc.join()
+
+    def _replace(self, slot, model_dir):
+        """Start a worker for slot on model_dir, then stop the old one -> False if the new one never got ready"""
+        proc, ready = self._spawn(slot, model_dir)
+        if not ready.wait(WORKER_READY_TIMEOUT):
+            # Новый воркер не поднялся - старый продолжает обслуживать запросы
+            self._stop_worker(proc)
+            return False
+        old, _ = self.workers[slot]
+        self.workers[slot] = (proc, ready)
+        self._stop_worker(old)
+        return True
+
+    def rolling_restart(self):
+        """Re-export the model and move every worker onto it -> False if the workers stay on the old one"""
+        old_dir = self.model_dir
+        try:
+            new_dir = export_shared_model(self.model_root)
+        except Exception as e:
+            # Нет валидной модели для выгрузки - воркеры продолжают работать на текущей
+            logger.error(f"Model export failed, keeping the current workers on {old_dir}: {e}")
+            return False
+        for slot in range(len(self.workers)):
+            if not self._replace(slot, new_dir):
+                logger.error(f"Worker {slot} failed to start on the new model, rolling back to {old_dir}")
+                self._roll_back(slot, old_dir, new_dir)
+                return False
+        self.model_dir = new_dir
+        if old_dir:
+            shutil.rmtree(old_dir, ignore_errors=True)
+        return True
+
+    def _roll_back(self, upgraded, old_dir, new_dir):
+        """Return the first `upgraded` slots to old_dir, so workers never serve mixed model versions"""
+        stuck = [slot for slot in range(upgraded) if not self._replace(slot, old_dir)]
+        if stuck:
+            # Эти воркеры остаются на новой модели: ее каталог нужен им до остановки
+            logger.error(f"Workers {stuck} could not be rolled back and still serve {new_dir}")
+            self._retired.append(new_dir)
+        else:
+            shutil.rmtree(new_dir, ignore_errors=True)
+
+    def run(self):
+        signal.signal(signal.SIGHUP, lambda *_: setattr(self, "_reload", True))
+        signal.signal(signal.SIGTERM, lambda *_: setattr(self, "_stop", True))
+        signal.signal(signal.SIGINT, lambda *_: setattr(self, "_stop", True))
+
+        self.model_dir = export_shared_model(self.model_root)
+        self.workers = [self._spawn(slot) for slot in range(len(self.workers))]
+        try:
+            while not self._stop:
+                time.sleep(0.5)
+                if self._reload:
+                    self._reload = False
+                    logger.info("SIGHUP: reloading model and restarting workers")
+                    self.rolling_restart()
+                for slot, (proc, _) in enumerate(self.workers):
+                    if not proc.is_alive() and not self._stop:
+                        logger.warning(f"Worker {slot} exited with {proc.exitcode}, restarting")
+                        self.workers[slot] = self._spawn(slot)
+        finally:
+            for proc, _ in self.workers:
+                self._stop_worker(proc)
+            for path in [self.model_dir, *self._retired]:
+                shutil.rmtree(path, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the Credit Scoring API on several pinned workers")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--log-level", default="info")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((args.host, args.port))
+    sock.set_inheritable(True)
+    logger.info(f"Listening on {args.host}:{args.port} with {args.workers} workers")
+    Supervisor(sock, args.workers, args.log_level).run()
+
+
+if __name__ == "__main__":
+    main()
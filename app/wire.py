@@ -0,0 +1,57 @@
+"""Binary columnar request format for /predict/batch.
+
+    b"CSF1" | uint32 LE header length | JSON header {"features": [...], "rows": N} | N x F float64 LE, row-major
+
+The header names the feature order of the rows (any subset of the model features,
+aliases included); NaN marks a missing value and is filled from feature_means.json.
+The payload is mapped with np.frombuffer, so rows go into the scoring matrix without
+per-value parsing.
+"""
+import json
+import struct
+
+import numpy as np
+
+MAGIC = b"CSF1"
+CONTENT_TYPE = "application/vnd.credit-score.features+f64"
+MAX_HEADER = 1 << 20
+_PREFIX = struct.Struct("<4sI")
+
+
+class WireFormatError(ValueError):
+    """Raised when a binary request body does not follow the format"""
+
+
+def encode_rows(features, rows):
+    """Client side: feature names plus an (N, len(features)) array -> request body"""
+    rows = np.ascontiguousarray(rows, dtype="<f8")
+    if rows.ndim != 2 or rows.shape[1] != len(features):
+        raise ValueError(f"Expected an (N, {len(features)}) array, got {rows.shape}")
+    header = json.dumps({"features": list(features), "rows": rows.shape[0]}).encode()
+    return _PREFIX.pack(MAGIC, len(header)) + header + rows.tobytes()
+
+
+def decode_rows(body):
+    """Request body -> (feature names, read-only (N, F) float64 view of the body)"""
+    if len(body) < _PREFIX.size:
+        raise WireFormatError("Body is too short for the binary feature format")
+    magic, header_size = _PREFIX.unpack_from(body)
+    if magic != MAGIC:
+        raise WireFormatError(f"Bad magic {magic!r}, expected {MAGIC!r}")
+    if header_size > min(MAX_HEADER, len(body) - _PREFIX.size):
+        raise WireFormatError(f"Header length {header_size} does not fit the body")
+    try:
+        header = json.loads(body[_PREFIX.size:_PREFIX.size + header_size])
+        features, n = list(header["features"]), int(header["rows"])
+    except (ValueError, KeyError, TypeError) as e:
+        raise WireFormatError(f"Invalid header: {e}") from None
+    if not features or not all(isinstance(name, str) for name in features) or len(set(features)) != len(features):
+        raise WireFormatError("features must be a non-empty list of unique feature names")
+
+    offset = _PREFIX.size + header_size
+    expected = n * len(features) * 8
+    if n < 0 or len(body) - offset != expected:
+        raise WireFormatError(f"Expected {expected} payload bytes for {n} rows x {len(features)} features, "
+                              f"got {len(body) - offset}")
+    rows = np.frombuffer(body, dtype="<f8", count=n * len(features), offset=offset)
+    return features, rows.reshape(n, len(features))
@@ -0,0 +1,85 @@
+"""Shared helpers for the benchmark scripts: percentiles, memory, synthetic clients, JSON results."""
+import json
+import os
+import platform
+import random
+import resource
+import subprocess
+import sys
+from datetime import datetime, timezone
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Поля ClientData (/predict) и признаки модели, из которых они берутся
+CLIENT_DATA_FIELDS = {
+    "income": "INCOME",
+    "debt": "DEBT",
+    "expenditure": "T_EXPENDITURE_12",
+    "savings": "SAVINGS",
+    "credit_card": "CAT_CREDIT_CARD",
+    "mortgage": "CAT_MORTGAGE",
+    "dependents": "CAT_DEPENDENTS",
+}
+
+
+def synthetic_clients(n, seed=0):
+    """n full feature dicts from test_data_gen.generate_client, reproducible for a given seed"""
+    import test_data_gen
+
+    random.seed(seed)
+    return [test_data_gen.generate_client() for _ in range(n)]
+
+
+def client_data(client):
+    """Project a full synthetic client onto the /predict request body"""
+    return {field: client[feature] for field, feature in CLIENT_DATA_FIELDS.items()}
+
+
+def summarize(latencies):
+    """Seconds -> milliseconds summary with the percentiles we track"""
+    ms = np.asarray(latencies, dtype=np.float64) * 1000
+    if ms.size == 0:
+        return {"count": 0}
+    p50, p95, p99 = np.percentile(ms, [50, 95, 99])
+    return {"count": int(ms.size), "mean_ms": round(float(ms.mean()), 4), "p50_ms": round(float(p50), 4),
+            "p95_ms": round(float(p95), 4), "p99_ms": round(float(p99), 4), "max_ms": round(float(ms.max()), 4)}
+
+
+def rss_mb():
+    """Current resident set size (Linux), falling back to the peak"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2 ** 20
+    except OSError:
+        return peak_rss_mb()
+
+
+def peak_rss_mb():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 2 ** 20 if sys.platform == "darwin" else peak / 1024
+
+
+def environment():
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True,
+                                text=True).stdout.strip() or None
+    except OSError:
+        commit = None
+    return {
+        "commit": commit,
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+    }
+
+
+def write_results(path, suite, results, params=None):
+    """Write {"suite", "environment", "params", "results"} so compare.py can diff two runs"""
+    with open(path, "w") as f:
+        json.dump({"suite": suite, "environment": environment(), "params": params or {}, "results": results},
+                  f, indent=2)
+    print(f"Results written to {path}")
@@ -0,0 +1,72 @@
+"""Compare two benchmark result files and flag regressions.
+
+    python -m benchmarks.compare baseline.json candidate.json --threshold 10
+
+Works for any suite written by write_results (micro, load, startup). Exits with 1 if a
+tracked metric got worse by more than --threshold percent, so it can gate CI.
+"""
+import argparse
+import json
+import sys
+
+# Метрика -> True, если больше значит лучше
+TRACKED = {
+    "us_per_op": False,
+    "ops_per_s": True,
+    "throughput_rps": True,
+    "p50_ms": False,
+    "p95_ms": False,
+    "p99_ms": False,
+    "median_s": False,
+    "cpu_us_per_request": False,
+    "peak_rss_mb": False,
+}
+
+
+def flatten(results, prefix=""):
+    for key, value in results.items():
+        if isinstance(value, dict):
+            yield from flatten(value, f"{prefix}{key}.")
+        elif key in TRACKED and isinstance(value, (int, float)):
+            yield f"{prefix}{key}", key, value
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("baseline")
+    parser.add_argument("candidate")
+    parser.add_argument("--threshold", type=float, default=10.0, help="allowed regression, percent")
+    args = parser.parse_args()
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.candidate) as f:
+        candidate = json.load(f)
+    if baseline["suite"] != candidate["suite"]:
+        sys.exit(f"Different suites: {baseline['suite']} vs {candidate['suite']}")
+
+    changed = {k for k in set(baseline["params"]) | set(candidate["params"])
+               if k != "json" and baseline["params"].get(k) != candidate["params"].get(k)}
+    if changed:
+        print(f"Note: runs used different parameters: {', '.join(sorted(changed))}")
+
+    old = {path: value for path, _, value in flatten(baseline["results"])}
+    regressions = 0
+    print(f"{baseline['environment'].get('commit')} -> {candidate['environment'].get('commit')}")
+    print(f"{'metric':<50} {'baseline':>12} {'candidate':>12} {'change':>9}")
+    for path, key, value in flatten(candidate["results"]):
+        if path not in old or not old[path]:
+            continue
+        change = (value - old[path]) / old[path] * 100
+        worse = -change if TRACKED[key] else change
+        flag = ""
+        if worse > args.threshold:
+            flag = "  REGRESSION"
+            regressions += 1
+        print(f"{path:<50} {old[path]:>12.3f} {value:>12.3f} {change:>+8.1f}%{flag}")
+    if regressions:
+        sys.exit(f"{regressions} metric(s) regressed by more than {args.threshold}%")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""In-process load generator: drives the ASGI app directly, no server and no network.
+
+    python -m benchmarks.load --requests 2000 --concurrency 32 --json load.json
+
+Every scenario sends --requests requests from --concurrency concurrent workers through
+httpx.ASGITransport, so the numbers cover routing, validation, scoring and
+serialization but not the socket layer. The portfolio runs on a throwaway SQLite file
+seeded with synthetic clients; nothing touches the real portfolio.db.
+"""
+import argparse
+import asyncio
+import os
+import random
+import tempfile
+import time
+import warnings
+
+from benchmarks.common import ROOT, client_data, peak_rss_mb, rss_mb, summarize, synthetic_clients, write_results
+
+SCENARIOS = ("predict", "predict_batch", "portfolio_clients", "portfolio_statistics", "health")
+
+
+def build_requests(scenario, clients, batch_size, rng):
+    """-> function returning (method, url, json body) for the next request of the scenario"""
+    if scenario == "predict":
+        bodies = [client_data(c) for c in clients]
+        return lambda: ("POST", "/predict", rng.choice(bodies))
+    if scenario == "predict_batch":
+        return lambda: ("POST", "/predict/batch", {"clients": rng.sample(clients, batch_size)})
+    if scenario == "portfolio_clients":
+        levels = [None, "Low", "Medium", "High"]
+
+        def portfolio():
+            level = rng.choice(levels)
+            return "GET", "/portfolio/clients?limit=100" + (f"&risk_level={level}" if level else ""), None
+        return portfolio
+    if scenario == "portfolio_statistics":
+        return lambda: ("GET", "/portfolio/statistics", None)
+    return lambda: ("GET", "/health", None)
+
+
+async def run_scenario(client, next_request, total, concurrency):
+    latencies, errors = [], 0
+    remaining = total
+
+    async def worker():
+        nonlocal remaining, errors
+        while remaining > 0:
+            remaining -= 1
+            method, url, body = next_request()
+            started = time.perf_counter()
+            response = await client.request(method, url, json=body)
+            latencies.append(time.perf_counter() - started)
+            if response.status_code >= 400:
+                errors += 1
+
+    rss_before = rss_mb()
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    return dict(summarize(latencies), errors=errors, seconds=round(elapsed, 3),
+                throughput_rps=round(len(latencies) / elapsed, 1),
+                rss_mb=round(rss_mb(), 1), rss_growth_mb=round(rss_mb() - rss_before, 1))
+
+
+async def run(args):
+    import httpx
+    from app.main import app, portfolio_store
+
+    rng = random.Random(args.seed)
+    clients = synthetic_clients(args.clients, args.seed)
+    results = {}
+    async with app.router.lifespan_context(app):
+        # Портфель для сценариев чтения: синтетические клиенты со скорингом через сам API
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            scored = (await client.post("/predict/batch", json={"clients": clients})).json()["predictions"]
+            portfolio_store.append_many([{"client_id": f"BENCH-{i}", "data": c, "result": p["result"]}
+                                         for i, (c, p) in enumerate(zip(clients, scored)) if "result" in p])
+
+            for scenario in args.scenarios:
+                next_request = build_requests(scenario, clients, args.batch_size, rng)
+                await run_scenario(client, next_request, min(args.warmup, args.requests), args.concurrency)
+                results[scenario] = await run_scenario(client, next_request, args.requests, args.concurrency)
+                r = results[scenario]
+                print(f"{scenario:<22} {r['throughput_rps']:>10.1f} {r['p50_ms']:>9.3f} {r['p95_ms']:>9.3f} "
+                      f"{r['p99_ms']:>9.3f} {r['errors']:>7} {r['rss_mb']:>8.1f}")
+    results["peak_rss_mb"] = round(peak_rss_mb(), 1)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="In-process ASGI load test of the scoring service")
+    parser.add_argument("--requests", type=int, default=2000, help="requests per scenario")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--warmup", type=int, default=200)
+    parser.add_argument("--clients", type=int, default=1000, help="synthetic clients to draw requests from")
+    parser.add_argument("--batch-size", type=int, default=100, help="clients per /predict/batch request")
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=list(SCENARIOS))
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="write machine-readable results here")
+    args = parser.parse_args()
+
+    os.chdir(ROOT)
+    tmp = tempfile.mkdtemp(prefix="credit-bench-")
+    os.environ["PORTFOLIO_DB"] = os.path.join(tmp, "portfolio.db")
+    os.environ.setdefault("AUDIT_DIR", os.path.join(tmp, "audit"))
+    os.environ.setdefault("MODEL_WATCH_INTERVAL", "0")
+    os.environ.setdefault("LOG_LEVEL", "WARNING")
+    warnings.filterwarnings("ignore")
+
+    print(f"{'scenario':<22} {'req/s':>10} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'errors':>7} {'rss MB':>8}")
+    results = asyncio.run(run(args))
+    print(f"peak RSS {results['peak_rss_mb']} MB")
+    if args.json:
+        write_results(args.json, "load", results, vars(args))
+
+
+if __name__ == "__main__":
+    main()
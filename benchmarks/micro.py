@@ -0,0 +1,79 @@
+"""Micro-benchmarks of the scoring hot path.
+
+    python -m benchmarks.micro --json micro.json
+
+Covers feature assembly (make_full_vector), the fused scoring engine, the raw
+sklearn calls it replaced and CreditScoringPredictor, each for a single client
+and for a batch. Timings are the best of --repeat rounds, per operation.
+"""
+import argparse
+import os
+import tempfile
+import timeit
+import warnings
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.common import ROOT, synthetic_clients, write_results
+
+
+def bench(fn, repeat):
+    number, _ = timeit.Timer(fn).autorange()
+    best = min(timeit.repeat(fn, number=number, repeat=repeat)) / number
+    return {"us_per_op": round(best * 1e6, 3), "ops_per_s": round(1 / best, 1)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Micro-benchmarks of feature assembly and scoring")
+    parser.add_argument("--batch", type=int, default=1000, help="rows in the batch cases")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="write machine-readable results here")
+    args = parser.parse_args()
+
+    os.chdir(ROOT)
+    # Импорт app.api.predict открывает журнал аудита - не в рабочем каталоге репозитория
+    os.environ.setdefault("AUDIT_DIR", os.path.join(tempfile.mkdtemp(prefix="credit-bench-"), "audit"))
+    os.environ.setdefault("MODEL_WATCH_INTERVAL", "0")
+    warnings.filterwarnings("ignore")  # артефакты из другой версии sklearn
+    from app.api.predict import make_full_vector, registry
+    from app.predictor import CreditScoringPredictor
+
+    bundle = registry.current
+    predictor = CreditScoringPredictor()
+    clients = synthetic_clients(args.batch, args.seed)
+    client = clients[0]
+    x = make_full_vector(client, bundle)
+    matrix, _ = bundle.assembler.matrix(clients)
+    row = pd.DataFrame(x.reshape(1, -1), columns=predictor.features)
+    frame = pd.DataFrame(matrix, columns=predictor.features)
+    scaled_row, scaled = predictor.scaler.transform(row), predictor.scaler.transform(frame)
+
+    cases = {
+        "make_full_vector": lambda: make_full_vector(client, bundle),
+        "assembler.matrix[batch]": lambda: bundle.assembler.matrix(clients),
+        "engine.score": lambda: bundle.engine.score(x),
+        "engine.score_many[batch]": lambda: bundle.engine.score_many(matrix),
+        "sklearn.scaler.transform": lambda: predictor.scaler.transform(row),
+        "sklearn.linear.predict": lambda: predictor.linear_model.predict(scaled_row),
+        "sklearn.logistic.predict_proba": lambda: predictor.logistic_model.predict_proba(scaled_row),
+        "sklearn.pipeline[batch]": lambda: (predictor.linear_model.predict(scaled),
+                                            predictor.logistic_model.predict_proba(predictor.scaler.transform(frame))),
+        "predictor.predict_full": lambda: predictor.predict_full(client),
+        "predictor.predict_many[batch]": lambda: predictor.predict_many(clients),
+        "predictor.predict_many[array]": lambda: predictor.predict_many(matrix),
+        "policy.decide_many[batch]": lambda: predictor.policy.decide_many(np.linspace(0, 1, args.batch)),
+    }
+
+    results = {}
+    print(f"{'case':<34} {'us/op':>12} {'ops/s':>12}")
+    for name, fn in cases.items():
+        results[name] = bench(fn, args.repeat)
+        print(f"{name:<34} {results[name]['us_per_op']:>12.3f} {results[name]['ops_per_s']:>12.1f}")
+    if args.json:
+        write_results(args.json, "micro", results, vars(args))
+
+
+if __name__ == "__main__":
+    main()
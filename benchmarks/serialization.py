@@ -0,0 +1,113 @@
+"""Per-request CPU of the /predict I/O path: orjson decode/encode vs the pydantic + default JSON path.
+
+    python -m benchmarks.serialization --requests 5000 --json serialization.json
+
+Micro cases time body decoding and response encoding on their own. The end-to-end
+case sends the same bodies through the ASGI app to /predict and to a copy of the
+previous handler (pydantic ClientData in, dict out through FastAPI's encoder) mounted
+only for the benchmark, and reports process CPU time per request.
+"""
+import argparse
+import asyncio
+import os
+import random
+import tempfile
+import time
+import timeit
+import warnings
+
+import orjson
+
+from benchmarks.common import ROOT, client_data, synthetic_clients, write_results
+
+LEGACY_ROUTE = "/bench/legacy-predict"
+
+
+def bench(fn, repeat=5):
+    number, _ = timeit.Timer(fn).autorange()
+    return round(min(timeit.repeat(fn, number=number, repeat=repeat)) / number * 1e6, 3)
+
+
+async def cpu_per_request(client, url, bodies, rounds):
+    cpu, wall = time.process_time(), time.perf_counter()
+    for _ in range(rounds):
+        for body in bodies:
+            response = await client.post(url, content=body, headers={"content-type": "application/json"})
+            assert response.status_code == 200, response.text
+    n = rounds * len(bodies)
+    return {"cpu_us_per_request": round((time.process_time() - cpu) / n * 1e6, 1),
+            "wall_us_per_request": round((time.perf_counter() - wall) / n * 1e6, 1)}
+
+
+async def end_to_end(bodies, rounds):
+    import httpx
+    from app.api.predict import ClientData, executor, registry, run_inference, score_client
+    from app.main import app
+
+    @app.post(LEGACY_ROUTE, include_in_schema=False)
+    async def legacy_predict(client: ClientData):
+        return await run_inference(executor.run(score_client, registry.current, client.model_dump()))
+
+    results = {}
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+            for url in ("/predict", LEGACY_ROUTE):  # прогрев
+                await cpu_per_request(client, url, bodies[:50], 1)
+            # Чередуем пути, чтобы дрейф частоты CPU не достался одному из них
+            for name, url in (("orjson", "/predict"), ("pydantic", LEGACY_ROUTE)) * 2:
+                run = await cpu_per_request(client, url, bodies, rounds)
+                best = results.get(name)
+                if best is None or run["cpu_us_per_request"] < best["cpu_us_per_request"]:
+                    results[name] = run
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-request CPU of the /predict serialization path")
+    parser.add_argument("--requests", type=int, default=5000, help="requests per path and round")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="write machine-readable results here")
+    args = parser.parse_args()
+
+    os.chdir(ROOT)
+    tmp = tempfile.mkdtemp(prefix="credit-bench-")
+    os.environ["PORTFOLIO_DB"] = os.path.join(tmp, "portfolio.db")
+    os.environ.setdefault("AUDIT_DIR", os.path.join(tmp, "audit"))
+    os.environ.setdefault("MODEL_WATCH_INTERVAL", "0")
+    os.environ.setdefault("LOG_LEVEL", "WARNING")
+    os.environ["PREDICTION_CACHE_SIZE"] = "0"  # иначе повторные тела отвечаются из кэша
+    warnings.filterwarnings("ignore")
+
+    from fastapi.encoders import jsonable_encoder
+    from fastapi.responses import JSONResponse
+    from app.api.predict import ClientData, decode_client
+    from app.api.responses import ORJSONResponse
+
+    rng = random.Random(args.seed)
+    bodies = [orjson.dumps(client_data(c)) for c in synthetic_clients(1000, args.seed)]
+    body = rng.choice(bodies)
+    response = {"result": {"credit_score": 612.37, "default_probability": 8.41, "risk_level": "Low",
+                           "decision": "APPROVE"}, "model_version": "2025-11-04T05:52:08.775440"}
+
+    results = {"micro_us": {
+        "decode.pydantic": bench(lambda: ClientData.model_validate_json(body).model_dump()),
+        "decode.orjson": bench(lambda: decode_client(body)),
+        "encode.fastapi": bench(lambda: JSONResponse(jsonable_encoder(response)).body),
+        "encode.orjson": bench(lambda: ORJSONResponse(response).body),
+    }}
+    for name, us in results["micro_us"].items():
+        print(f"{name:<20} {us:>9.3f} us")
+
+    rounds = max(1, args.requests // len(bodies))
+    results["end_to_end"] = asyncio.run(end_to_end(bodies, rounds))
+    for name, r in results["end_to_end"].items():
+        print(f"/predict via {name:<9} {r['cpu_us_per_request']:>9.1f} us CPU  {r['wall_us_per_request']:>9.1f} us wall")
+    old, new = results["end_to_end"]["pydantic"], results["end_to_end"]["orjson"]
+    results["cpu_saved_pct"] = round((1 - new["cpu_us_per_request"] / old["cpu_us_per_request"]) * 100, 1)
+    print(f"CPU per request: -{results['cpu_saved_pct']}%")
+    if args.json:
+        write_results(args.json, "serialization", results, vars(args))
+
+
+if __name__ == "__main__":
+    main()
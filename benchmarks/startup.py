@@ -0,0 +1,71 @@
+"""Cold-start benchmark: time to import app.main in a fresh interpreter.
+
+    python -m benchmarks.startup --runs 5 --json startup.json
+
+Compares loading the joblib artifacts (sklearn + pandas path) with the compact
+model.json + model.f64 export, each in a throwaway copy of models/, and reports
+which heavy modules ended up imported.
+"""
+import argparse
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+
+from benchmarks.common import ROOT, write_results
+
+HEAVY_MODULES = ("pandas", "sklearn", "scipy", "joblib")
+
+PROBE = """
+import sys, time
+t0 = time.perf_counter()
+import app.main
+elapsed = time.perf_counter() - t0
+print(elapsed, ",".join(m for m in {heavy!r} if m in sys.modules))
+"""
+
+
+def measure(models_dir, runs):
+    env = dict(os.environ, MODELS_DIR=models_dir, MODEL_WATCH_INTERVAL="0", LOG_LEVEL="WARNING",
+               PORTFOLIO_DB=os.path.join(models_dir, "portfolio.db"), AUDIT_DIR=os.path.join(models_dir, "audit"))
+    env.pop("CREDIT_SCORE_SHARED_MODEL", None)
+    wall, loaded = [], ""
+    for _ in range(runs):
+        out = subprocess.run([sys.executable, "-c", PROBE.format(heavy=HEAVY_MODULES)], cwd=ROOT, env=env,
+                             capture_output=True, text=True, check=True).stdout.split()
+        wall.append(float(out[0]))
+        loaded = out[1] if len(out) > 1 else "-"
+    return wall, loaded
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--models-dir", default=os.path.join(ROOT, "models"))
+    parser.add_argument("--json", help="write machine-readable results here")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        joblib_dir, compact_dir = os.path.join(tmp, "joblib"), os.path.join(tmp, "compact")
+        ignore = shutil.ignore_patterns(".*", "model.json", "model.f64")
+        shutil.copytree(args.models_dir, joblib_dir, ignore=ignore)
+        shutil.copytree(args.models_dir, compact_dir, ignore=ignore)
+        subprocess.run([sys.executable, "-m", "app.registry", "--models-dir", compact_dir], cwd=ROOT,
+                       check=True, capture_output=True)
+
+        print(f"{'format':<8} {'median s':>9} {'min s':>7}  heavy modules imported")
+        results = {}
+        for name, path in (("joblib", joblib_dir), ("compact", compact_dir)):
+            wall, loaded = measure(path, args.runs)
+            results[name] = {"median_s": round(statistics.median(wall), 4), "min_s": round(min(wall), 4),
+                             "heavy_modules": loaded}
+            print(f"{name:<8} {results[name]['median_s']:>9.3f} {min(wall):>7.3f}  {loaded}")
+        print(f"speedup  {results['joblib']['median_s'] / results['compact']['median_s']:.1f}x")
+    if args.json:
+        write_results(args.json, "startup", results, vars(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,20 @@
+import os
+import tempfile
+
+# Настройки читаются при импорте app.config: база портфеля и аудит - во временном каталоге
+_tmp = tempfile.mkdtemp(prefix="credit-score-tests-")
+os.environ.setdefault("PORTFOLIO_DB", os.path.join(_tmp, "portfolio.db"))
+os.environ.setdefault("AUDIT_DIR", os.path.join(_tmp, "audit"))
+os.environ.setdefault("MODEL_WATCH_INTERVAL", "0")
+os.environ.setdefault("DRIFT_REPORT_INTERVAL", "0")
+
+import pytest  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+
+
+@pytest.fixture(scope="session")
+def client():
+    from app.main import app
+
+    with TestClient(app) as test_client:
+        yield test_client
@@ -0,0 +1,75 @@
+import gzip
+import os
+
+import orjson
+import pytest
+
+from app.api import predict
+from app.audit import AuditLog, BodyDigest
+
+
+def read_entries(directory):
+    entries = []
+    for name in sorted(os.listdir(directory)):
+        with gzip.open(os.path.join(directory, name), "rb") as segment:
+            entries.extend(orjson.loads(line) for line in segment)
+    return entries
+
+
+def test_close_drains_the_queue(tmp_path):
+    # Писатель почти не просыпается сам: все записи пишет close()
+    log = AuditLog(str(tmp_path), batch_size=10**6, flush_interval=3600, fsync=False)
+    for i in range(2500):
+        assert log.record("/predict", "v1", {"i": i}, {"decision": "APPROVE"})
+    log.close()
+
+    entries = read_entries(tmp_path)
+    assert [e["request"]["i"] for e in entries] == list(range(2500))
+    assert entries[0]["endpoint"] == "/predict" and entries[0]["model_version"] == "v1"
+    assert log.pending == 0
+
+
+def test_raw_body_is_written_verbatim(tmp_path):
+    log = AuditLog(str(tmp_path), fsync=False)
+    log.record("/predict", "v1", b'{"income":\n5000}', {"decision": "APPROVE"})
+    log.record("/predict/batch", "v1", {"blake2b": BodyDigest(b"rows")}, [])
+    log.close()
+
+    first, second = read_entries(tmp_path)
+    assert first["request"] == {"income": 5000}
+    assert len(second["request"]["blake2b"]) == 32
+
+
+@pytest.mark.parametrize("on_full, accepted", [("drop", True), ("reject", False)])
+def test_closed_log_refuses_entries(tmp_path, on_full, accepted):
+    log = AuditLog(str(tmp_path), on_full=on_full, fsync=False)
+    log.close()
+    assert log.record("/predict", "v1", {}, {}) is accepted
+    assert read_entries(tmp_path) == []
+
+
+@pytest.fixture
+def audit(tmp_path, monkeypatch):
+    log = AuditLog(str(tmp_path), fsync=False)
+    monkeypatch.setattr(predict, "audit", log)
+    return log
+
+
+def test_scenarios_audit_the_base_decision(client, audit, tmp_path):
+    body = {"client": {"INCOME": 5000, "DEBT": 1000}, "grid": {"DEBT": {"factors": [1, 2, 4]}}}
+    response = client.post("/predict/scenarios", json=body)
+    assert response.status_code == 200
+    audit.close()
+
+    [entry] = read_entries(tmp_path)
+    assert entry["endpoint"] == "/predict/scenarios"
+    assert entry["response"] == response.json()["base"]
+    assert entry["request"] == body
+
+
+def test_rejected_audit_is_503(client, tmp_path, monkeypatch):
+    log = AuditLog(str(tmp_path), on_full="reject", fsync=False)
+    log.close()
+    monkeypatch.setattr(predict, "audit", log)
+    body = {"client": {"INCOME": 5000}, "grid": {"DEBT": {"values": [0, 1000]}}}
+    assert client.post("/predict/scenarios", json=body).status_code == 503
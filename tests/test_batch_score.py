@@ -0,0 +1,73 @@
+import json
+import os
+import sys
+import warnings
+
+import pandas as pd
+import pytest
+
+from app import batch_score
+from app.predictor import CreditScoringPredictor
+
+MODELS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "models")
+CLIENTS = [
+    {"client_id": f"c{i}", "INCOME": 3000 + 1500 * i, "DEBT": 500 * i, "SAVINGS": 200 * i if i % 3 else None}
+    for i in range(7)
+]
+
+pytestmark = pytest.mark.filterwarnings("ignore")  # артефакты из другой версии sklearn
+
+
+@pytest.fixture(scope="module")
+def expected():
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        predictor = CreditScoringPredictor(MODELS_DIR)
+    return [predictor.predict_full({k: v for k, v in c.items() if k != "client_id" and v is not None})
+            for c in CLIENTS]
+
+
+def assert_scored(path, expected):
+    out = pd.read_csv(path) if path.endswith(".csv") else pd.read_json(path, lines=True)
+    assert out["client_id"].tolist() == [c["client_id"] for c in CLIENTS]
+    assert out["credit_score"].tolist() == pytest.approx([e["credit_score"] for e in expected], abs=0.01)
+    assert out["decision"].tolist() == [e["decision"] for e in expected]
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_csv_in_chunks(tmp_path, expected, workers):
+    source, target = str(tmp_path / "in.csv"), str(tmp_path / "out.csv")
+    # Лишний столбец игнорируется, нечисловая ячейка - как пустая
+    frame = pd.DataFrame(CLIENTS).assign(note="x")
+    frame["SAVINGS"] = frame["SAVINGS"].astype(object).where(frame["SAVINGS"].notna(), "n/a")
+    frame.to_csv(source, index=False)
+    assert batch_score.score_file(source, target, MODELS_DIR, chunk_size=3, workers=workers) == len(CLIENTS)
+    assert_scored(target, expected)
+
+
+def test_jsonl_with_nested_features(tmp_path, expected):
+    source, target = tmp_path / "in.jsonl", str(tmp_path / "out.jsonl")
+    with open(source, "w") as f:
+        for c in CLIENTS:
+            data = {k.lower(): v for k, v in c.items() if k != "client_id" and v is not None}
+            f.write(json.dumps({"client_id": c["client_id"], "data": data}) + "\n")
+    assert batch_score.score_file(str(source), target, MODELS_DIR, chunk_size=4) == len(CLIENTS)
+    assert_scored(target, expected)
+
+
+def test_input_without_feature_columns(tmp_path, monkeypatch):
+    source, target = str(tmp_path / "in.csv"), str(tmp_path / "out.csv")
+    pd.DataFrame({"client_id": ["a"], "salary": [1000]}).to_csv(source, index=False)
+    with pytest.raises(ValueError, match="None of the input columns"):
+        batch_score.score_file(source, target, MODELS_DIR)
+    assert not os.path.exists(target)
+
+    monkeypatch.setattr(sys, "argv", ["batch_score", source, target, "--models-dir", MODELS_DIR])
+    with pytest.raises(SystemExit) as exit_info:
+        batch_score.main()
+    assert exit_info.value.code == 1
+
+
+def test_unsupported_extension(tmp_path):
+    with pytest.raises(ValueError, match="Unsupported file type"):
+        batch_score.score_file(str(tmp_path / "in.xlsx"), str(tmp_path / "out.csv"), MODELS_DIR)
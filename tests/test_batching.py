@@ -0,0 +1,83 @@
+import asyncio
+
+import numpy as np
+import pytest
+
+from app.batching import MicroBatcher
+
+
+class Engine:
+    """Stands in for ScoringEngine: score = row sum, probability = engine tag; records every batch"""
+
+    def __init__(self, tag=0.5):
+        self.tag = tag
+        self.batches = []
+
+    def score_many(self, matrix):
+        self.batches.append(len(matrix))
+        return matrix.sum(axis=1), np.full(len(matrix), self.tag)
+
+
+async def run_inline(fn, *args):
+    return fn(*args)
+
+
+def submit_all(batcher, items):
+    async def main():
+        return await asyncio.gather(*(batcher.submit(np.array(v, dtype=float), e) for v, e in items))
+    return asyncio.run(main())
+
+
+def test_concurrent_requests_share_one_batch():
+    engine = Engine()
+    batcher = MicroBatcher(run_inline, max_batch=64, max_wait=0.01)
+    results = submit_all(batcher, [([i, 1.0], engine) for i in range(10)])
+    # Каждый ожидающий получает свою строку, хотя скорились одной матрицей
+    assert results == [(i + 1.0, 0.5) for i in range(10)]
+    assert engine.batches == [10]
+    assert batcher.stats()["requests"] == 10 and batcher.stats()["batches"] == 1
+
+
+def test_full_window_flushes_without_waiting():
+    engine = Engine()
+    batcher = MicroBatcher(run_inline, max_batch=4, max_wait=60)
+    results = submit_all(batcher, [([i], engine) for i in range(8)])
+    assert [score for score, _ in results] == list(range(8))
+    assert engine.batches == [4, 4]
+    assert batcher.stats()["max_batch_size"] == 4
+
+
+def test_model_versions_are_scored_apart():
+    old, new = Engine(0.1), Engine(0.9)
+    batcher = MicroBatcher(run_inline, max_wait=0.01)
+    results = submit_all(batcher, [([1.0], old), ([2.0], new), ([3.0], old)])
+    assert results == [(1.0, 0.1), (2.0, 0.9), (3.0, 0.1)]
+    assert old.batches == [2] and new.batches == [1]
+
+
+def test_runner_error_reaches_every_waiter():
+    async def failing(fn, *args):
+        raise RuntimeError("pool is gone")
+
+    batcher = MicroBatcher(failing, max_wait=0.01)
+
+    async def main():
+        return await asyncio.gather(*(batcher.submit(np.zeros(1), Engine()) for _ in range(3)),
+                                    return_exceptions=True)
+    errors = asyncio.run(main())
+    assert all(isinstance(e, RuntimeError) for e in errors)
+
+
+def test_cancelled_waiter_does_not_break_the_batch():
+    engine = Engine()
+    batcher = MicroBatcher(run_inline, max_wait=0.01)
+
+    async def main():
+        gone = asyncio.ensure_future(batcher.submit(np.array([1.0]), engine))
+        kept = asyncio.ensure_future(batcher.submit(np.array([2.0]), engine))
+        await asyncio.sleep(0)
+        gone.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await gone
+        return await kept
+    assert asyncio.run(main()) == (2.0, 0.5)
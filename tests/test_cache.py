@@ -0,0 +1,57 @@
+import numpy as np
+import pytest
+
+from app.api import predict
+from app.cache import PredictionCache
+from app.registry import ModelBundle
+from app.scoring import ScoringEngine
+
+CLIENT = {"income": 7100, "debt": 900, "expenditure": 400, "savings": 1300,
+          "credit_card": 1, "mortgage": 1, "dependents": 0}
+
+
+def test_lru_and_ttl():
+    cache = PredictionCache(maxsize=2, ttl=60)
+    a, b, c = (PredictionCache.key(np.array([x])) for x in (1.0, 2.0, 3.0))
+    cache.put(a, "v1", (600.0, 0.1))
+    cache.put(b, "v1", (500.0, 0.2))
+    assert cache.get(a, "v1") == (600.0, 0.1)  # a - теперь самый свежий
+    cache.put(c, "v1", (400.0, 0.3))
+    assert cache.get(b, "v1") is None and cache.get(a, "v1") is not None
+    assert cache.stats()["evictions"] == 1
+
+    expired = PredictionCache(ttl=-1)
+    expired.put(a, "v1", (600.0, 0.1))
+    assert expired.get(a, "v1") is None and expired.stats()["size"] == 0
+
+
+def test_negative_zero_shares_the_key():
+    assert PredictionCache.key(np.array([0.0, 1.0])) == PredictionCache.key(np.array([-0.0, 1.0]))
+
+
+def test_version_change_clears_entries():
+    cache = PredictionCache()
+    key = PredictionCache.key(np.array([1.0]))
+    cache.put(key, "v1+aaaa", (600.0, 0.1))
+    assert cache.get(key, "v1+bbbb") is None
+    assert cache.get(key, "v1+aaaa") is None  # старые записи удалены, а не спрятаны
+    assert cache.stats()["invalidations"] == 1
+
+
+@pytest.mark.skipif(predict.cache is None, reason="prediction cache is disabled")
+def test_swapped_weights_are_not_served_from_cache(client, monkeypatch):
+    current = predict.registry.current
+    first = client.post("/predict", json=CLIENT).json()
+    assert client.post("/predict", json=CLIENT).json() == first
+    hits = predict.cache.hits
+
+    # Та же версия по имени, другие веса: ключ кэша - имя + отпечаток весов
+    e = current.engine
+    engine = ScoringEngine(e.mean, e.scale, e.coef, np.asarray(e.intercept) + [50.0, 0.0])
+    swapped = ModelBundle(current.version, engine, current.assembler, current.metadata, current.path)
+    monkeypatch.setattr(predict.registry, "current", swapped)
+
+    second = client.post("/predict", json=CLIENT).json()
+    assert second["result"]["credit_score"] == pytest.approx(first["result"]["credit_score"] + 50, abs=0.02)
+    assert predict.cache.hits == hits
+    assert predict.cache.stats()["model_version"] == swapped.cache_version
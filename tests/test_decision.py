@@ -0,0 +1,67 @@
+import numpy as np
+import pytest
+
+from app import config
+from app.decision import DecisionPolicy
+
+POLICY = DecisionPolicy([0.10, 0.25])
+
+
+@pytest.mark.parametrize("prob, expected", [
+    (0.0, ("Low", "APPROVE")),
+    (0.10, ("Low", "APPROVE")),
+    (np.nextafter(0.10, 1), ("Medium", "REVIEW")),
+    (0.25, ("Medium", "REVIEW")),
+    (np.nextafter(0.25, 1), ("High", "REJECT")),
+    (1.0, ("High", "REJECT")),
+])
+def test_band_edges(prob, expected):
+    assert POLICY.decide(prob) == expected
+    levels, decisions = POLICY.decide_many(np.array([prob]))
+    assert (levels[0], decisions[0]) == expected
+
+
+def test_vectorized_matches_scalar():
+    probs = np.concatenate([np.random.default_rng(0).random(1000), [0.10, 0.25]])
+    levels, decisions = POLICY.decide_many(probs)
+    assert list(zip(levels, decisions)) == [POLICY.decide(p) for p in probs]
+    np.testing.assert_array_equal(POLICY.bands(probs), [POLICY.levels.index(level) for level in levels])
+
+
+def test_approval_follows_decisions():
+    policy = DecisionPolicy([0.05, 0.10, 0.25], levels=("Prime", "Low", "Medium", "High"),
+                            decisions=("REVIEW", "APPROVE", "APPROVE", "REJECT"))
+    np.testing.assert_array_equal(policy.approved(np.arange(4)), [False, True, True, False])
+    assert policy.decide(0.07) == ("Low", "APPROVE")
+
+
+@pytest.mark.parametrize("thresholds, levels, decisions", [
+    ([0.25, 0.10], ("Low", "Medium", "High"), ("APPROVE", "REVIEW", "REJECT")),
+    ([0.0, 0.25], ("Low", "Medium", "High"), ("APPROVE", "REVIEW", "REJECT")),
+    ([0.10, 1.0], ("Low", "Medium", "High"), ("APPROVE", "REVIEW", "REJECT")),
+    ([0.10, 0.25], ("Low", "High"), ("APPROVE", "REVIEW", "REJECT")),
+    ([0.10], ("Low", "High"), ("APPROVE", "REVIEW", "REJECT")),
+])
+def test_invalid_policy(thresholds, levels, decisions):
+    with pytest.raises(ValueError):
+        DecisionPolicy(thresholds, levels, decisions)
+
+
+def test_describe():
+    bands = POLICY.describe()
+    assert list(bands) == ["low", "medium", "high"]
+    assert bands["low"] == {"max_default_probability": 10.0, "decision": "APPROVE",
+                            "description": "Low risk - Recommended for approval"}
+    assert bands["medium"]["min_default_probability"] == 10.0
+    assert bands["medium"]["max_default_probability"] == 25.0
+    assert "max_default_probability" not in bands["high"]
+
+
+def test_from_config():
+    policy = DecisionPolicy.from_config()
+    assert policy.thresholds == config.RISK_THRESHOLDS
+    assert policy.decisions == config.RISK_DECISIONS
+
+
+def test_statistics_endpoint_describes_the_policy(client):
+    assert client.get("/statistics").json()["risk_thresholds"] == DecisionPolicy.from_config().describe()
@@ -0,0 +1,94 @@
+import json
+
+import numpy as np
+import pytest
+
+from app.drift import PSI_MIN_ROWS, DriftMonitor
+from app.registry import ModelBundle
+
+
+@pytest.fixture(scope="module")
+def bundle():
+    from app.api.predict import registry
+
+    return registry.current
+
+
+def training_like(bundle, n, seed=0):
+    """Rows drawn from the training moments: normal for continuous features, Bernoulli for 0/1 flags"""
+    rng = np.random.default_rng(seed)
+    mean, std = bundle.engine.mean, bundle.engine.scale
+    rows = rng.normal(mean, std, size=(n, len(mean)))
+    binary = DriftMonitor()._current(bundle).binary
+    rows[:, binary] = rng.random((n, binary.sum())) < mean[binary]
+    return rows
+
+
+def test_training_like_traffic_does_not_drift(bundle):
+    monitor = DriftMonitor()
+    monitor.observe_many(bundle, training_like(bundle, 20000))
+    report = monitor.compute()
+    assert report["observed"] == 20000
+    assert report["drifted"] == []
+    assert report["features"]["CAT_MORTGAGE"]["psi_baseline"] == "bernoulli"
+    assert report["features"]["CAT_GAMBLING_ENCODED"]["psi"] is None
+
+
+def test_shifted_features_drift(bundle):
+    rows = training_like(bundle, 20000)
+    features = bundle.assembler.features
+    rows[:, features.index("CAT_MORTGAGE")] = 1.0
+    rows[:, features.index("INCOME")] += 3 * bundle.engine.scale[features.index("INCOME")]
+    monitor = DriftMonitor()
+    monitor.observe_many(bundle, rows)
+    report = monitor.compute()
+    assert {"CAT_MORTGAGE", "INCOME"} <= set(report["drifted"])
+    assert report["features"]["INCOME"]["mean_shift"] == pytest.approx(3, abs=0.1)
+
+
+def test_small_window_never_alerts(bundle):
+    monitor = DriftMonitor()
+    rows = training_like(bundle, PSI_MIN_ROWS - 1)
+    rows[:, 0] += 100 * bundle.engine.scale[0]
+    for row in rows:
+        monitor.observe(bundle, row)
+    report = monitor.compute()
+    assert report["observed"] == PSI_MIN_ROWS - 1
+    assert report["drifted"] == []
+
+
+def test_single_and_batch_observations_agree(bundle):
+    rows = training_like(bundle, 3000)
+    one, many = DriftMonitor(), DriftMonitor()
+    for row in rows:
+        one.observe(bundle, row)
+    many.observe_many(bundle, rows)
+    a, b = one.compute()["features"]["INCOME"], many.compute()["features"]["INCOME"]
+    assert a["mean"] == pytest.approx(b["mean"]) and a["std"] == pytest.approx(b["std"])
+
+
+def test_extreme_value_keeps_report_serializable(bundle):
+    monitor = DriftMonitor()
+    rows = training_like(bundle, 2000)
+    rows[0, 0] = 1e200
+    rows[1, 1] = -1e308
+    monitor.observe_many(bundle, rows)
+    report = monitor.compute()
+    json.dumps(report, allow_nan=False)
+    assert report["features"][bundle.assembler.features[0]]["max"] == 1e200
+
+
+def test_new_model_version_starts_a_new_window(bundle):
+    monitor = DriftMonitor()
+    monitor.observe_many(bundle, training_like(bundle, 100))
+    other = ModelBundle("other", bundle.engine, bundle.assembler, bundle.metadata)
+    monitor.observe_many(other, training_like(bundle, 10))
+    report = monitor.compute()
+    assert report["model_version"] == "other" and report["observed"] == 10
+
+
+def test_drift_endpoint_after_extreme_input(client):
+    assert client.post("/predict", json={"data": {"INCOME": 1e200}}).status_code == 200
+    response = client.get("/monitoring/drift", params={"refresh": True})
+    assert response.status_code == 200
+    assert response.json()["features"]["INCOME"]["max"] == 1e200
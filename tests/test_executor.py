@@ -0,0 +1,62 @@
+import asyncio
+import contextvars
+import threading
+
+import pytest
+
+from app.api import predict
+from app.executor import ExecutorSaturated, InferenceExecutor
+
+CLIENT = {"income": 5000, "debt": 100, "expenditure": 200, "savings": 300,
+          "credit_card": 1, "mortgage": 0, "dependents": 2}
+
+request_id = contextvars.ContextVar("request_id", default=None)
+
+
+def test_runs_in_pool_with_caller_context():
+    executor = InferenceExecutor(2, 0)
+
+    async def main():
+        request_id.set("abc")
+        return await executor.run(lambda x: (x * 2, request_id.get(), threading.current_thread().name), 21)
+
+    try:
+        value, seen_id, thread = asyncio.run(main())
+    finally:
+        executor.shutdown()
+    assert value == 42 and seen_id == "abc"
+    assert thread.startswith("inference")
+
+
+def test_saturated_queue_fails_fast():
+    executor = InferenceExecutor(1, 1)
+    release = threading.Event()
+
+    async def main():
+        # Одно задание выполняется, одно в очереди - третье сразу получает отказ
+        jobs = [asyncio.ensure_future(executor.run(release.wait)) for _ in range(2)]
+        await asyncio.sleep(0)
+        assert executor.pending == 2
+        with pytest.raises(ExecutorSaturated):
+            await executor.run(release.wait)
+        release.set()
+        await asyncio.gather(*jobs)
+        assert executor.pending == 0
+        return await executor.run(sum, [1, 2])
+
+    try:
+        assert asyncio.run(main()) == 3
+    finally:
+        release.set()
+        executor.shutdown()
+
+
+@pytest.mark.parametrize("path, body", [("/predict", CLIENT), ("/predict/batch", {"clients": [CLIENT]}),
+                                        ("/predict/explain", CLIENT)])
+def test_saturation_is_503(client, monkeypatch, path, body):
+    monkeypatch.setattr(predict.executor, "max_pending", 0)
+    if predict.cache is not None:
+        monkeypatch.setattr(predict, "cache", None)  # иначе повторный клиент отвечается из кэша
+    response = client.post(path, json=body)
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == str(predict.config.INFERENCE_RETRY_AFTER)
@@ -0,0 +1,57 @@
+import math
+
+import pytest
+
+from app.api import predict
+
+CLIENTS = [
+    {"income": 5000, "debt": 100, "expenditure": 200, "savings": 300,
+     "credit_card": 1, "mortgage": 0, "dependents": 2},
+    {"data": {"INCOME": 1200, "DEBT": 40000}},
+    {"data": {"INCOME": "not a number"}},
+]
+
+
+def assert_adds_up(result, explanation):
+    # base + top_k + other = выход модели: score - как есть, вероятность - через логит
+    for output, value in (("credit_score", result["credit_score"]),
+                          ("default_log_odds", None)):
+        part = explanation[output]
+        total = part["base"] + sum(c["contribution"] for c in part["contributions"]) + part["other"]
+        if value is None:
+            prob = 1 / (1 + math.exp(-total))
+            assert round(prob * 100, 2) == pytest.approx(result["default_probability"], abs=0.01)
+        else:
+            assert round(total, 2) == pytest.approx(value, abs=0.01)
+
+
+@pytest.mark.parametrize("top_k", [1, 5, 100])
+def test_explain_contributions_sum_to_output(client, top_k):
+    response = client.post(f"/predict/explain?top_k={top_k}", json=CLIENTS[0])
+    assert response.status_code == 200
+    body = response.json()
+    contributions = body["explanation"]["credit_score"]["contributions"]
+    assert len(contributions) == min(top_k, len(predict.registry.current.assembler.features))
+    magnitudes = [abs(c["contribution"]) for c in contributions]
+    assert magnitudes == sorted(magnitudes, reverse=True)
+    assert_adds_up(body["result"], body["explanation"])
+
+
+def test_explain_batch_matches_single(client):
+    response = client.post("/predict/explain/batch", json={"clients": CLIENTS})
+    assert response.status_code == 200
+    body = response.json()
+    assert body["total"] == 3 and body["successful"] == 2
+    assert "error" in body["explanations"][2]
+    for item, data in zip(body["explanations"][:2], CLIENTS):
+        single = client.post("/predict/explain", json=data).json()
+        assert item["result"] == single["result"]
+        assert_adds_up(item["result"], item["explanation"])
+
+
+def test_explain_batch_limit(client, monkeypatch):
+    monkeypatch.setattr(predict.config, "EXPLAIN_MAX_CLIENTS", 2)
+    response = client.post("/predict/explain/batch", json={"clients": CLIENTS})
+    assert response.status_code == 413
+    assert "limit is 2" in response.json()["detail"]
+    assert client.post("/predict/explain/batch", json={"clients": CLIENTS[:2]}).status_code == 200
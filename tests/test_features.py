@@ -0,0 +1,88 @@
+import json
+import os
+
+import numpy as np
+import pytest
+
+from app.features import FeatureAssembler, UnknownFeatureError, derived_ratios
+
+MODELS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "models")
+
+
+@pytest.fixture(scope="module")
+def assembler():
+    with open(os.path.join(MODELS_DIR, "feature_means.json")) as f:
+        return FeatureAssembler(json.load(f))
+
+
+def value(assembler, row, name):
+    return row[assembler.column(name)]
+
+
+def test_derived_ratio_rules():
+    features = ["INCOME", "SAVINGS", "DEBT", "T_TAX_12", "T_TAX_6", "R_TAX", "R_TAX_INCOME", "R_TAX_DEBT",
+                "R_DEBT_INCOME", "T_GIFTS_12", "R_GIFTS"]
+    assert sorted(derived_ratios(features)) == sorted([
+        ("R_DEBT_INCOME", "DEBT", "INCOME"),
+        ("R_TAX", "T_TAX_6", "T_TAX_12"),
+        ("R_TAX_INCOME", "T_TAX_12", "INCOME"),
+        ("R_TAX_DEBT", "T_TAX_12", "DEBT"),
+    ])  # R_GIFTS - нет T_GIFTS_6, R_SAVINGS_INCOME - нет самого признака
+
+
+def test_ratios_follow_the_totals(assembler):
+    row = assembler.vector({"INCOME": 5000, "DEBT": 1000, "SAVINGS": 0, "T_TAX_12": 600, "T_TAX_6": 150})
+    assert value(assembler, row, "R_DEBT_INCOME") == pytest.approx(0.2)
+    assert value(assembler, row, "R_TAX") == pytest.approx(0.25)
+    assert value(assembler, row, "R_TAX_INCOME") == pytest.approx(0.12)
+    assert value(assembler, row, "R_TAX_DEBT") == pytest.approx(0.6)
+    assert value(assembler, row, "R_SAVINGS_INCOME") == 0
+    # Нулевой знаменатель - значение по умолчанию, а не inf
+    defaults = assembler.vector({})
+    for name in ("R_DEBT_SAVINGS", "R_TAX_SAVINGS"):
+        assert value(assembler, row, name) == value(assembler, defaults, name)
+
+
+def test_sent_ratio_wins_and_lone_numerator_keeps_default(assembler):
+    row = assembler.vector({"INCOME": 5000, "DEBT": 1000, "R_DEBT_INCOME": 0.9, "T_TAX_12": 600})
+    defaults = assembler.vector({})
+    assert value(assembler, row, "R_DEBT_INCOME") == 0.9
+    # Знаменатель не прислан: делить на среднее из feature_means - значит выдумать отношение
+    assert value(assembler, row, "R_TAX_SAVINGS") == value(assembler, defaults, "R_TAX_SAVINGS")
+
+
+def test_vector_matrix_and_columns_agree(assembler):
+    rng = np.random.default_rng(0)
+    names = ["INCOME", "SAVINGS", "DEBT", "T_TAX_12", "T_TAX_6", "T_GROCERIES_12", "R_DEBT_SAVINGS", "income"]
+    records = []
+    for _ in range(200):
+        chosen = rng.choice(names[:-1], size=rng.integers(0, len(names)), replace=False)
+        record = {str(name): float(rng.choice([0.0, rng.uniform(1, 1e5)])) for name in chosen}
+        if "INCOME" in record and rng.random() < 0.5:
+            record["income"] = record.pop("INCOME")  # псевдоним в нижнем регистре
+        records.append(record)
+
+    vectors = np.array([assembler.vector(r) for r in records])
+    matrix, errors = assembler.matrix(records)
+    assert errors == [None] * len(records)
+    np.testing.assert_array_equal(matrix, vectors)
+
+    columns = {name: np.array([r.get(name, r.get(name.lower(), np.nan)) for r in records]) for name in names[:-1]}
+    np.testing.assert_array_equal(assembler.column_matrix(columns), vectors)
+
+
+def test_aliases_and_unknown_names(assembler):
+    assert assembler.column("expenditure") == assembler.column("T_EXPENDITURE_12")
+    assert assembler.column("Credit_Card") == assembler.column("CAT_CREDIT_CARD")
+    with pytest.raises(UnknownFeatureError):
+        assembler.column("SALARY")
+    with pytest.raises(ValueError, match="both feature INCOME"):
+        assembler.column_matrix({"income": [1.0], "INCOME": [2.0]})
+
+
+def test_bad_records_keep_their_index(assembler):
+    matrix, errors = assembler.matrix([{"INCOME": 1}, {"SALARY": 1}, {"DEBT": float("nan")}, [1, 2], {"DEBT": "x"}])
+    assert errors[0] is None
+    assert "SALARY" in errors[1] and "finite" in errors[2]
+    assert errors[3] and errors[4]
+    np.testing.assert_array_equal(matrix[1], assembler.defaults)
@@ -0,0 +1,89 @@
+import json
+from datetime import datetime, timedelta
+
+import pytest
+
+from app import main
+from app.portfolio import PortfolioStore
+
+
+def entry(client_id, score, prob, risk, decision, timestamp=None):
+    return {"client_id": client_id, "timestamp": timestamp, "data": {"INCOME": 1000},
+            "result": {"credit_score": score, "default_probability": prob,
+                       "risk_level": risk, "decision": decision}}
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = PortfolioStore(str(tmp_path / "portfolio.db"))
+    yield store
+    store.close()
+
+
+def test_append_and_statistics(store):
+    store.append(entry("a", 650, 5, "Low", "APPROVE"))
+    store.append_many([entry("b", 450, 30, "High", "REJECT"), entry("a", 550, 15, "Medium", "REVIEW")])
+
+    stats = store.statistics()
+    assert stats["count"] == 3
+    assert stats["avg_score"] == 550
+    assert stats["decision_distribution"]["APPROVE"] == pytest.approx(33.33)
+    assert stats["score_histogram"]["counts"] == [0, 1, 1, 1, 0, 0]
+    assert [e["result"]["credit_score"] for e in store.client_history("a")] == [650, 550]
+    # Поддерживаемые агрегаты совпадают с пересчетом с нуля
+    assert store.recompute_stats() == stats
+
+
+def test_rolling_windows(store):
+    now = datetime.now()
+    store.append(entry("new", 700, 2, "Low", "APPROVE", now.isoformat()))
+    store.append(entry("day", 600, 12, "Medium", "REVIEW", (now - timedelta(hours=5)).isoformat()))
+    store.append(entry("month", 400, 50, "High", "REJECT", (now - timedelta(days=10)).isoformat()))
+    store.append(entry("old", 400, 50, "High", "REJECT", (now - timedelta(days=90)).isoformat()))
+
+    assert store.statistics("hour")["count"] == 1
+    assert store.statistics("day")["count"] == 2
+    assert store.statistics("30d")["count"] == 3
+    assert store.statistics()["count"] == 4
+
+
+def test_keyset_pagination_with_filters(store):
+    store.append_many([entry(str(i), 300 + i * 10, i, "Low" if i % 2 else "High", "APPROVE",
+                             f"2025-01-01T00:00:{i:02d}") for i in range(25)])
+
+    seen, cursor = [], None
+    while True:
+        page, cursor = store.page(10, cursor, risk_level="Low")
+        seen.extend(e["client_id"] for e in page)
+        if cursor is None:
+            break
+    assert seen == [str(i) for i in range(1, 25, 2)]
+
+    page, _ = store.page(100, since="2025-01-01T00:00:10", until="2025-01-01T00:00:13", min_score=410)
+    assert [e["client_id"] for e in page] == ["11", "12"]
+    assert sum(len(p) for p in store.iter_pages(limit=7, chunk_size=3)) == 7
+
+
+def test_clients_endpoint_parses_time_filters(client, monkeypatch, tmp_path):
+    store = PortfolioStore(str(tmp_path / "portfolio.db"))
+    monkeypatch.setattr(main, "portfolio_store", store)
+    store.append_many([entry(str(day), 600, 10, "Low", "APPROVE", f"2025-01-{day:02d}T12:00:00.000001")
+                       for day in range(1, 11)])
+
+    def ids(**params):
+        response = client.get("/portfolio/clients", params=params)
+        assert response.status_code == 200
+        return [e["client_id"] for e in response.json()["clients"]]
+
+    # Дата без времени - полночь; сравнение по времени, а не по строкам
+    assert ids(since="2025-01-09") == ["9", "10"]
+    assert ids(since="2025-01-09T12:00:00", until="2025-01-10") == ["9"]
+    local = datetime(2025, 1, 3).astimezone()
+    assert ids(until=local.isoformat()) == ["1", "2"]
+
+    response = client.get("/portfolio/clients", params={"format": "ndjson", "limit": 3, "since": "2025-01-05"})
+    assert [json.loads(line)["client_id"] for line in response.text.splitlines()] == ["5", "6", "7"]
+
+    for params in ({"since": "yesterday"}, {"until": "2025-13-01"}):
+        assert client.get("/portfolio/clients", params=params).status_code == 422
+    store.close()
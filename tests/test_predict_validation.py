@@ -0,0 +1,109 @@
+"""/predict and /predict/batch decode bodies by hand (orjson); these tests pin them to the pydantic models.
+
+The reference for /predict is ClientData with finite-only floats: the decoder accepts and
+rejects the same inputs with the same error types and locations, except that NaN/inf are
+rejected (422, finite_number) where plain ClientData would let them through.
+"""
+import json
+
+import orjson
+import pytest
+from fastapi import HTTPException
+from pydantic import FiniteFloat, ValidationError, create_model
+
+from app.api.predict import ClientData, decode_client
+
+VALID = {"income": 5000, "debt": 100, "expenditure": 200, "savings": 300,
+         "credit_card": 1, "mortgage": 0, "dependents": 2}
+VALUES = [1, 1.5, -0.0, True, "1.5", "12", " 12 ", "1_000", "1e3", "1.0",
+          "abc", "", "١٢", None, [], {}, "nan", "inf", "-inf", "NaN", "Infinity"]
+
+FiniteClientData = create_model(
+    "FiniteClientData",
+    **{name: (FiniteFloat if field.annotation is float else field.annotation, ...)
+       for name, field in ClientData.model_fields.items()})
+
+
+def reference_errors(body):
+    try:
+        # FastAPI проверяет тело в режиме from_attributes - отсюда и тип ошибки для не-объекта
+        FiniteClientData.model_validate(json.loads(body), from_attributes=True)
+    except ValidationError as e:
+        return [(error["type"], ["body", *error["loc"]]) for error in e.errors()]
+    return None
+
+
+def decoder_errors(body):
+    try:
+        decode_client(body)
+    except HTTPException as e:
+        assert e.status_code == 422
+        return [(error["type"], error["loc"]) for error in e.detail]
+    return None
+
+
+@pytest.mark.parametrize("field", ["income", "credit_card"])
+@pytest.mark.parametrize("value", VALUES, ids=repr)
+def test_decode_client_matches_pydantic(field, value):
+    body = json.dumps({**VALID, field: value}).encode()
+    assert decoder_errors(body) == reference_errors(body)
+
+
+@pytest.mark.parametrize("body", [
+    {k: v for k, v in VALID.items() if k != "debt"},
+    {**VALID, "unknown_field": 1},
+    {},
+    [],
+    "text",
+])
+def test_decode_client_shapes_match_pydantic(body):
+    raw = json.dumps(body).encode()
+    assert decoder_errors(raw) == reference_errors(raw)
+
+
+@pytest.mark.parametrize("value", ["nan", "inf", "-Infinity", "abc", None, [], {}])
+def test_predict_rejects_bad_values(client, value):
+    response = client.post("/predict", content=orjson.dumps({**VALID, "income": value}))
+    assert response.status_code == 422
+    response = client.post("/predict", content=orjson.dumps({"data": {"INCOME": value}}))
+    assert response.status_code == 422
+    assert response.json()["detail"][0]["loc"] == ["body", "data", "INCOME"]
+
+
+def test_predict_rejects_unknown_feature(client):
+    assert client.post("/predict", json={"data": {"NOT_A_FEATURE": 1}}).status_code == 422
+
+
+def test_predict_rejects_invalid_json(client):
+    response = client.post("/predict", content=b'{"income": NaN}')
+    assert response.status_code == 422
+    assert response.json()["detail"][0]["type"] == "json_invalid"
+
+
+def test_predict_ignores_unknown_fields_like_pydantic(client):
+    plain = client.post("/predict", json=VALID).json()
+    extra = client.post("/predict", json={**VALID, "unknown_field": 1}).json()
+    assert extra["result"] == plain["result"]
+
+
+@pytest.mark.parametrize("path", ["/predict/batch", "/predict/explain/batch"])
+def test_batch_reports_bad_rows(client, path):
+    # Батч не падает целиком: плохие строки получают ошибку, остальные скорятся
+    clients = [{"INCOME": "nan"}, {"data": {"INCOME": "inf"}}, {"INCOME": "abc"}, {"INCOME": None},
+               {"NOT_A_FEATURE": 1}, "not an object", {"INCOME": 5000}]
+    response = client.post(path, json={"clients": clients})
+    assert response.status_code == 200
+    items = response.json()["predictions" if path == "/predict/batch" else "explanations"]
+    assert [("error" in item) for item in items] == [True] * 6 + [False]
+    assert response.json()["successful"] == 1
+
+
+@pytest.mark.parametrize("body", [b"{", b"[]", b'{"clients": 1}', b'{"rows": []}'])
+def test_batch_rejects_malformed_body(client, body):
+    assert client.post("/predict/batch", content=body).status_code == 422
+
+
+def test_batch_matches_single_predict(client):
+    single = client.post("/predict", json={"data": {"INCOME": 5000, "DEBT": 1200}}).json()["result"]
+    batch = client.post("/predict/batch", json={"clients": [{"data": {"INCOME": 5000, "DEBT": 1200}}]}).json()
+    assert batch["predictions"][0]["result"] == single
@@ -0,0 +1,74 @@
+import os
+import warnings
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.decision import DecisionPolicy
+from app.features import UnknownFeatureError
+from app.predictor import CreditScoringPredictor
+
+MODELS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "models")
+CLIENTS = [
+    {"INCOME": 5000, "DEBT": 1200, "SAVINGS": 300},
+    {"income": 18029, "R_DEBT_INCOME": 0.4},
+    {},
+    {"INCOME": 900, "DEBT": 90000},
+]
+
+pytestmark = pytest.mark.filterwarnings("ignore")  # артефакты из другой версии sklearn
+
+
+@pytest.fixture(scope="module")
+def predictor():
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        return CreditScoringPredictor(MODELS_DIR)
+
+
+def assert_same(many, singles):
+    for name in ("credit_score", "default_probability"):
+        assert list(many[name]) == pytest.approx([s[name] for s in singles])
+    for name in ("default_class", "risk_level", "decision"):
+        assert list(many[name]) == [s[name] for s in singles]
+
+
+def test_records_match_predict_full(predictor):
+    assert_same(predictor.predict_many(CLIENTS), [predictor.predict_full(c) for c in CLIENTS])
+
+
+def test_columnar_and_array_inputs(predictor):
+    singles = [predictor.predict_full(c) for c in CLIENTS]
+    # Столбцы: отсутствующее значение - NaN, его достраивают так же, как не присланный ключ
+    frame = pd.DataFrame([{k.upper(): v for k, v in c.items()} for c in CLIENTS])
+    assert_same(predictor.predict_many(frame), singles)
+    assert_same(predictor.predict_many({name: frame[name].to_numpy() for name in frame.columns}), singles)
+
+    matrix = np.full((len(CLIENTS), len(predictor.features)), np.nan)
+    for i, c in enumerate(CLIENTS):
+        for key, value in c.items():
+            matrix[i, predictor.assembler.column(key)] = value
+    assert_same(predictor.predict_many(matrix), singles)
+
+
+def test_unknown_names(predictor):
+    with pytest.raises(ValueError, match="Record 1"):
+        predictor.predict_many([{"INCOME": 1}, {"SALARY": 1}])
+    with pytest.raises(UnknownFeatureError):
+        predictor.predict_many({"SALARY": [1.0]})
+    scored = predictor.predict_many({"SALARY": [1.0], "INCOME": [5000.0]}, ignore_unknown=True)
+    assert len(scored["credit_score"]) == 1
+    with pytest.raises(ValueError):
+        predictor.predict_many(np.zeros((2, 3)))
+
+
+def test_uses_the_given_policy(predictor):
+    policy = DecisionPolicy([0.01, 0.5], decisions=("REVIEW", "APPROVE", "REJECT"))
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        custom = CreditScoringPredictor(MODELS_DIR, policy=policy)
+    scored = custom.predict_many(CLIENTS)
+    _, expected = policy.decide_many(np.asarray(scored["default_probability"]) / 100)
+    assert list(scored["decision"]) == list(expected)
+    assert list(scored["credit_score"]) == list(predictor.predict_many(CLIENTS)["credit_score"])
@@ -0,0 +1,87 @@
+import os
+import shutil
+
+import numpy as np
+import pytest
+
+from app.registry import COMPACT_DATA, COMPACT_HEADER, ModelRegistry
+
+MODELS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "models")
+
+
+def add_version(root, name):
+    path = os.path.join(root, name)
+    os.makedirs(path)
+    for file in (COMPACT_HEADER, COMPACT_DATA):
+        shutil.copy(os.path.join(MODELS_DIR, file), path)
+    return path
+
+
+@pytest.fixture
+def registry(tmp_path):
+    add_version(tmp_path, "v1")
+    registry = ModelRegistry(str(tmp_path))
+    registry.load()
+    return registry
+
+
+def test_loads_newest_version(registry):
+    assert registry.current.version == "v1"
+    assert registry.check_for_update() is False
+
+
+def test_hot_swap(registry, tmp_path):
+    before = registry.current
+    row = np.asarray(before.assembler.defaults).reshape(1, -1)
+    expected = before.engine.score_many(row)
+
+    add_version(tmp_path, "v2")
+    assert registry.check_for_update() is True
+    assert registry.current.version == "v2"
+    assert registry.current.cache_version != before.cache_version
+    # Запрос, взявший старый бандл до подмены, доскоривается на нем
+    np.testing.assert_array_equal(before.engine.score_many(row), expected)
+    assert registry.check_for_update() is False
+
+
+def test_invalid_version_is_rejected_once(registry, tmp_path):
+    path = add_version(tmp_path, "v2")
+    break_version(path)
+    assert registry.check_for_update() is False
+    assert registry.current.version == "v1"
+    # Те же файлы повторно не проверяются; исправленные - подхватываются
+    assert registry.check_for_update() is False
+    shutil.copy(os.path.join(MODELS_DIR, COMPACT_DATA), path)
+    stamp = os.path.getmtime(os.path.join(path, COMPACT_DATA)) + 10
+    os.utime(os.path.join(path, COMPACT_DATA), (stamp, stamp))
+    assert registry.check_for_update() is True
+    assert registry.current.version == "v2"
+
+
+def test_served_version_in_responses(client):
+    from app.api.predict import registry
+
+    response = client.post("/predict", json={"data": {"INCOME": 5000}})
+    assert response.json()["model_version"] == registry.current.version
+
+
+def break_version(path):
+    with open(os.path.join(path, COMPACT_DATA), "r+b") as f:
+        f.truncate(64)
+
+
+def test_load_falls_back_to_older_valid_version(tmp_path):
+    add_version(tmp_path, "v1")
+    break_version(add_version(tmp_path, "v2"))
+    registry = ModelRegistry(str(tmp_path))
+    assert registry.load().version == "v1"
+    # Сломанная v2 уже отвергнута при старте и повторно не проверяется
+    assert registry.check_for_update() is False
+    assert registry.current.version == "v1"
+
+
+def test_load_fails_without_any_valid_version(tmp_path):
+    break_version(add_version(tmp_path, "v1"))
+    break_version(add_version(tmp_path, "v2"))
+    with pytest.raises(RuntimeError):
+        ModelRegistry(str(tmp_path)).load()
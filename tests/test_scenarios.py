@@ -0,0 +1,64 @@
+import numpy as np
+import pytest
+
+from app.api import predict
+from app.api.predict import ScenarioAxis, score_scenarios
+from app.decision import DecisionPolicy
+
+CLIENT = {"INCOME": 5000, "DEBT": 1000}
+GRID = {"DEBT": {"factors": [0.5, 1, 2, 50, 100]}, "INCOME": {"values": [1000, 5000, 20000]}}
+
+
+def axes(grid):
+    return {name: ScenarioAxis(**axis) for name, axis in grid.items()}
+
+
+def test_grid_matches_scoring_each_point(client):
+    response = client.post("/predict/scenarios", json={"client": CLIENT, "grid": GRID})
+    assert response.status_code == 200
+    body = response.json()
+    assert body["shape"] == [5, 3]
+    assert body["axes"]["DEBT"] == [500.0, 1000.0, 2000.0, 50000.0, 100000.0]
+
+    # Каждая точка сетки - как отдельный клиент: отношения (R_DEBT_INCOME и др.) пересчитаны
+    bundle = predict.registry.current
+    assembler = bundle.assembler
+    for i, debt in enumerate(body["axes"]["DEBT"]):
+        for k, income in enumerate(body["axes"]["INCOME"]):
+            row = np.full((1, len(assembler.features)), np.nan)
+            row[0, assembler.column("DEBT")] = debt
+            row[0, assembler.column("INCOME")] = income
+            score, prob = bundle.engine.score_many(assembler.complete(row))
+            assert body["credit_score"][i][k] == pytest.approx(round(float(score[0]), 2))
+            assert body["band"][i][k] == int(predict.policy.bands(prob)[0])
+
+
+def test_boundary_follows_policy_decisions(monkeypatch):
+    # Порядок решений задается конфигурацией: одобрение может быть и не в полосе 0
+    monkeypatch.setattr(predict, "policy", DecisionPolicy([0.10, 0.25], decisions=("REVIEW", "APPROVE", "REJECT")))
+    result = score_scenarios(predict.registry.current, CLIENT, axes(GRID))
+    approved = np.asarray(predict.policy.decisions)[result["band"]] == "APPROVE"
+    assert approved.any()
+
+    boundary = set(zip(result["approval_boundary"]["DEBT"], result["approval_boundary"]["INCOME"]))
+    for i, k in np.argwhere(approved):
+        assert (result["axes"]["DEBT"][i], result["axes"]["INCOME"][k]) in boundary
+    assert len(boundary) == approved.sum()
+
+
+@pytest.mark.parametrize("grid", [
+    {},
+    {"DEBT": {"values": []}},
+    {"DEBT": {"values": [1], "factors": [1]}},
+    {"NO_SUCH_FEATURE": {"values": [1]}},
+    {"DEBT": {"values": [1]}, "debt": {"values": [2]}},
+])
+def test_invalid_grid_is_422(client, grid):
+    assert client.post("/predict/scenarios", json={"client": CLIENT, "grid": grid}).status_code == 422
+
+
+def test_grid_size_limit(client, monkeypatch):
+    monkeypatch.setattr(predict.config, "SCENARIO_MAX_POINTS", 14)
+    response = client.post("/predict/scenarios", json={"client": CLIENT, "grid": GRID})
+    assert response.status_code == 422
+    assert "limit is 14" in response.json()["detail"]
@@ -0,0 +1,89 @@
+import os
+import warnings
+
+import joblib
+import numpy as np
+import pytest
+from sklearn.linear_model import LinearRegression, LogisticRegression
+from sklearn.preprocessing import StandardScaler
+
+from app.registry import ModelBundle
+from app.scoring import ScoringEngine, top_k_indices
+
+MODELS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "models")
+
+
+@pytest.fixture(scope="module")
+def artifacts():
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")  # артефакты из другой версии sklearn
+        return tuple(joblib.load(os.path.join(MODELS_DIR, name))
+                     for name in ("scaler.joblib", "linear_regression.joblib", "logistic_model.joblib"))
+
+
+def sample(scaler, n, spread=3.0, seed=1):
+    rng = np.random.default_rng(seed)
+    return scaler.mean_ + rng.standard_normal((n, len(scaler.mean_))) * scaler.scale_ * spread
+
+
+def test_engine_matches_sklearn(artifacts):
+    scaler, linear_model, logistic_model = artifacts
+    engine = ScoringEngine.from_sklearn(scaler, linear_model, logistic_model)
+    rows = sample(scaler, 500)
+    scaled = scaler.transform(rows)
+
+    scores, probs = engine.score_many(rows)
+    np.testing.assert_allclose(scores, linear_model.predict(scaled), rtol=1e-7, atol=1e-6)
+    np.testing.assert_allclose(probs, logistic_model.predict_proba(scaled)[:, 1], rtol=1e-7, atol=1e-9)
+    single = np.array([engine.score(row) for row in rows])
+    np.testing.assert_allclose(single, np.column_stack([scores, probs]), rtol=1e-12, atol=1e-12)
+
+
+def test_compact_export_matches_joblib(artifacts):
+    # Развернутый в models/ model.json/model.f64 - те же веса, что и joblib-артефакты
+    engine = ScoringEngine.from_sklearn(*artifacts)
+    compact = ModelBundle.load_compact(MODELS_DIR).engine
+    rows = sample(artifacts[0], 100)
+    for got, want in zip(compact.score_many(rows), engine.score_many(rows)):
+        np.testing.assert_allclose(got, want, rtol=1e-12, atol=1e-9)
+
+
+@pytest.mark.parametrize("multi_class", ["ovr", "multinomial"])
+def test_logistic_link(multi_class):
+    rng = np.random.default_rng(0)
+    X = rng.standard_normal((400, 4)) * [1, 10, 100, 0.1] + [0, 5, 50, 1]
+    y = (X[:, 0] + X[:, 1] / 10 + rng.standard_normal(400) > 0.5).astype(int)
+    scaler = StandardScaler().fit(X)
+    logistic_model = LogisticRegression(multi_class=multi_class).fit(scaler.transform(X), y)
+    linear_model = LinearRegression().fit(scaler.transform(X), X @ [1, 2, 3, 4])
+
+    # from_sklearn сам сверяет результат со sklearn и падает при расхождении
+    engine = ScoringEngine.from_sklearn(scaler, linear_model, logistic_model)
+    _, probs = engine.score_many(X)
+    np.testing.assert_allclose(probs, logistic_model.predict_proba(scaler.transform(X))[:, 1], atol=1e-12)
+
+
+def test_extreme_inputs_stay_probabilities(artifacts):
+    engine = ScoringEngine.from_sklearn(*artifacts)
+    rows = sample(artifacts[0], 4, spread=1e12)
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        _, probs = engine.score_many(rows)
+        single = [engine.score(row)[1] for row in rows]
+    assert np.all((probs >= 0) & (probs <= 1))
+    np.testing.assert_allclose(single, probs)
+
+
+def test_explain_terms_sum_to_outputs(artifacts):
+    engine = ScoringEngine.from_sklearn(*artifacts)
+    rows = sample(artifacts[0], 50)
+    scores, probs, contributions = engine.explain_many(rows)
+    np.testing.assert_allclose(contributions[0].sum(axis=1) + engine.intercept[0], scores)
+    np.testing.assert_allclose(scores, engine.score_many(rows)[0], rtol=1e-9)
+    np.testing.assert_allclose(probs, engine.score_many(rows)[1], rtol=1e-9)
+
+
+def test_top_k_indices():
+    values = np.array([[0.1, -5.0, 3.0, 0.0], [1.0, 1.5, -2.0, 0.5]])
+    np.testing.assert_array_equal(top_k_indices(values, 2), [[1, 2], [2, 1]])
+    assert top_k_indices(values, 10).shape == (2, 4)
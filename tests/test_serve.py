@@ -0,0 +1,100 @@
+"""Supervisor.rolling_restart with the worker processes and the model export replaced by fakes"""
+import os
+
+import pytest
+
+from app import serve
+
+
+class FakeProcess:
+    def __init__(self, model_dir):
+        self.model_dir = model_dir
+        self.pid = id(self)
+        self.stopped = False
+
+    def terminate(self):
+        self.stopped = True
+
+    def join(self, timeout=None):
+        pass
+
+    def is_alive(self):
+        return not self.stopped
+
+    def kill(self):
+        self.stopped = True
+
+
+class FakeReady:
+    def __init__(self, ok):
+        self.ok = ok
+
+    def wait(self, timeout):
+        return self.ok
+
+
+@pytest.fixture
+def supervisor(tmp_path, monkeypatch):
+    old = tmp_path / "old"
+    old.mkdir()
+    supervisor = serve.Supervisor(None, 3, model_root=str(tmp_path))
+    supervisor.model_dir = str(old)
+    supervisor.failing = set()  # (имя каталога модели, слот), где новый воркер не поднимается
+
+    def spawn(slot, model_dir=None):
+        model_dir = model_dir or supervisor.model_dir
+        return FakeProcess(model_dir), FakeReady((os.path.basename(model_dir), slot) not in supervisor.failing)
+
+    monkeypatch.setattr(supervisor, "_spawn", spawn)
+    supervisor.workers = [spawn(slot) for slot in range(3)]
+    return supervisor
+
+
+def exports_to(monkeypatch, path):
+    def export(root):
+        os.makedirs(path)
+        return path
+    monkeypatch.setattr(serve, "export_shared_model", export)
+
+
+def served(supervisor):
+    return [os.path.basename(proc.model_dir) for proc, _ in supervisor.workers]
+
+
+def test_rolling_restart_moves_every_worker(supervisor, tmp_path, monkeypatch):
+    exports_to(monkeypatch, str(tmp_path / "new"))
+    assert supervisor.rolling_restart() is True
+    assert served(supervisor) == ["new"] * 3
+    assert supervisor.model_dir == str(tmp_path / "new")
+    assert not (tmp_path / "old").exists()
+
+
+def test_failed_worker_rolls_everything_back(supervisor, tmp_path, monkeypatch):
+    exports_to(monkeypatch, str(tmp_path / "new"))
+    supervisor.failing = {("new", 2)}
+    assert supervisor.rolling_restart() is False
+    assert served(supervisor) == ["old"] * 3
+    assert supervisor.model_dir == str(tmp_path / "old")
+    assert not (tmp_path / "new").exists()
+    assert all(proc.is_alive() for proc, _ in supervisor.workers)
+
+
+def test_failed_export_keeps_current_workers(supervisor, monkeypatch):
+    def export(root):
+        raise RuntimeError("Model export failed")
+    monkeypatch.setattr(serve, "export_shared_model", export)
+    workers = list(supervisor.workers)
+    assert supervisor.rolling_restart() is False
+    assert supervisor.workers == workers
+    assert all(proc.is_alive() for proc, _ in workers)
+
+
+def test_hung_worker_is_killed(monkeypatch):
+    class Hung(FakeProcess):
+        def terminate(self):
+            pass  # SIGTERM проигнорирован
+
+    monkeypatch.setattr(serve, "WORKER_STOP_TIMEOUT", 0)
+    proc = Hung(None)
+    serve.Supervisor._stop_worker(proc)
+    assert not proc.is_alive()
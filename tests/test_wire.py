@@ -0,0 +1,61 @@
+import struct
+
+import numpy as np
+import pytest
+
+from app.wire import CONTENT_TYPE, MAGIC, WireFormatError, decode_rows, encode_rows
+
+FEATURES = ["INCOME", "DEBT", "SAVINGS"]
+
+
+def test_round_trip():
+    rows = np.array([[5000.0, 1200.0, np.nan], [18029.0, 0.0, 1639.0]])
+    features, decoded = decode_rows(encode_rows(FEATURES, rows))
+    assert features == FEATURES
+    np.testing.assert_array_equal(decoded, rows)  # NaN на своих местах
+    assert not decoded.flags.writeable  # вид на тело запроса, без копии
+
+
+def test_round_trip_empty_batch():
+    features, decoded = decode_rows(encode_rows(FEATURES, np.empty((0, 3))))
+    assert features == FEATURES and decoded.shape == (0, 3)
+
+
+def test_encode_checks_shape():
+    with pytest.raises(ValueError):
+        encode_rows(FEATURES, np.zeros((2, 2)))
+
+
+@pytest.mark.parametrize("body", [
+    b"CSF",
+    b"XXXX" + encode_rows(FEATURES, np.zeros((1, 3)))[4:],
+    struct.pack("<4sI", MAGIC, 1000) + b"{}",
+    struct.pack("<4sI", MAGIC, 2) + b"{}",
+    encode_rows(FEATURES, np.zeros((2, 3)))[:-8],
+    encode_rows([], np.zeros((1, 0))),
+    encode_rows(["INCOME", "INCOME"], np.zeros((1, 2))),
+])
+def test_decode_rejects_malformed(body):
+    with pytest.raises(WireFormatError):
+        decode_rows(body)
+
+
+def test_binary_batch_matches_json_batch(client):
+    rows = np.array([[5000.0, 1200.0, 300.0], [18029.0, np.nan, 1639.0]])
+    binary = client.post("/predict/batch", content=encode_rows(FEATURES, rows),
+                         headers={"Content-Type": CONTENT_TYPE}).json()
+    # NaN в бинарном формате = признак не прислан
+    clients = [{name: value for name, value in zip(FEATURES, row) if not np.isnan(value)} for row in rows]
+    predictions = client.post("/predict/batch", json={"clients": clients}).json()["predictions"]
+    assert binary["credit_score"] == [p["result"]["credit_score"] for p in predictions]
+    assert binary["default_probability"] == [p["result"]["default_probability"] for p in predictions]
+    assert binary["decision"] == [p["result"]["decision"] for p in predictions]
+
+
+@pytest.mark.parametrize("body", [b"garbage", encode_rows(["NOT_A_FEATURE"], np.zeros((1, 1))),
+                                  encode_rows(["INCOME"], np.array([[np.inf]])),
+                                  # Разные имена одного признака: второй столбец не должен молча затирать первый
+                                  encode_rows(["income", "INCOME"], np.array([[1000.0, 5000.0]]))])
+def test_binary_batch_rejects_bad_body(client, body):
+    response = client.post("/predict/batch", content=body, headers={"Content-Type": CONTENT_TYPE})
+    assert response.status_code == 422